@@ -0,0 +1,26 @@
+"""Fixed coordinate/date cases shared by the benchmarks.
+
+Each case pins the timezone so timings don't depend on the lookup, and
+together they cover the code paths that behave differently: polar day and
+night, positions either side of the date line and the days clocks change.
+"""
+from collections import namedtuple
+from datetime import date
+
+Case = namedtuple("Case", "name lat lng date timezone")
+
+CASES = [
+    Case("equator", 0.5, -150.0, date(2024, 3, 20), "Etc/GMT+10"),
+    Case("mid_latitude", 36.5, -4.9, date(2024, 6, 21), "Europe/Madrid"),
+    Case("polar_day", 78.2, 15.6, date(2024, 6, 21), "Arctic/Longyearbyen"),
+    Case("polar_night", 78.2, 15.6, date(2024, 12, 21), "Arctic/Longyearbyen"),
+    Case("date_line_east", -17.7, 179.9, date(2024, 9, 1), "Pacific/Fiji"),
+    Case("date_line_west", 51.9, -176.6, date(2024, 9, 1), "America/Adak"),
+    # Near the synthetic station in data/tide_stations.example.json
+    Case("dst_spring", 50.1, -5.5, date(2024, 3, 31), "Europe/London"),
+    Case("dst_fall", 40.6, -73.9, date(2024, 11, 3), "America/New_York"),
+    Case("dst_southern", -33.9, 151.3, date(2024, 4, 7), "Australia/Sydney"),
+]
+
+# A short coastal passage for the voyage benchmark: (lat, lng, knots)
+ROUTE = [(50.1, -5.5, 7.0), (48.5, -6.0, 7.0), (45.0, -9.5, 7.0), (40.0, -10.0, 7.0), (36.5, -8.0, 7.0)]
@@ -0,0 +1,102 @@
+"""Serialization cost per endpoint: FastAPI's default path versus typed fast responses.
+
+"before" is what FastAPI does with a returned dict (jsonable_encoder, then
+stdlib json in JSONResponse); "after" is typed_response(), which validates
+into the endpoint's schema and renders it with pydantic-core. Payloads are
+built locally with no network access. Run from the backend directory:
+
+    python benchmarks/serialization.py [--json]
+"""
+import json
+import os
+import sys
+import timeit
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from models.responses import typed_response  # noqa: E402
+from models.schemas import (  # noqa: E402
+    AlmanacResponse,
+    BatchDashboardResponse,
+    DashboardResponse,
+    LunarData,
+    PrayerData,
+    SolarData,
+    TidesResponse,
+    WeatherData,
+    WeatherForecastResponse,
+)
+from services.almanac import calculate_almanac  # noqa: E402
+from services.astronomy import calculate_astronomy  # noqa: E402
+from services.weather_client import build_weather  # noqa: E402
+
+LAT, LNG, TZ = 36.5, -4.9, "Europe/Madrid"
+DAY = date(2024, 6, 21)
+
+
+def payloads() -> dict:
+    astronomy = calculate_astronomy(LAT, LNG, DAY, TZ, "muslim_world_league")
+    weather = build_weather(
+        {"current": {"wave_height": 1.2, "wave_period": 6.5, "swell_wave_height": 0.8,
+                     "swell_wave_period": 11.0, "swell_wave_direction": 250}},
+        {"current": {"temperature_2m": 24.3, "visibility": 24000, "wind_speed_10m": 6.2,
+                     "wind_direction_10m": 280, "wind_gusts_10m": 9.1}},
+    )
+    dashboard = {"coordinates": {"lat": LAT, "lng": LNG}, "date": DAY.isoformat(), "timezone": TZ,
+                 **astronomy, "weather": weather}
+    return {
+        "dashboard": (DashboardResponse, dashboard),
+        "batch (100)": (BatchDashboardResponse, {"results": [dashboard] * 100}),
+        "solar": (SolarData, astronomy["solar"]),
+        "prayer": (PrayerData, astronomy["prayer"]),
+        "lunar": (LunarData, astronomy["lunar"]),
+        "tides": (TidesResponse, {**astronomy["tides"], "prediction": None}),
+        "almanac (30d)": (AlmanacResponse, {
+            "coordinates": {"lat": LAT, "lng": LNG}, "timezone": TZ, "start": "2024-06-01", "end": "2024-06-30",
+            "days": calculate_almanac(LAT, LNG, date(2024, 6, 1), date(2024, 6, 30), TZ),
+        }),
+        "weather": (WeatherData, weather),
+        "forecast (168h)": (WeatherForecastResponse, {
+            "coordinates": {"lat": LAT, "lng": LNG}, "timezone": TZ,
+            "hours": [{"time": f"2024-06-{21 + h // 24:02d}T{h % 24:02d}:00+02:00", **weather} for h in range(168)],
+        }),
+    }
+
+
+def before(content: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def after(model, content: dict) -> bytes:
+    return typed_response(model, content).body
+
+
+def measure(fn, *args) -> float:
+    """Best-of-5 mean time per call in microseconds."""
+    timer = timeit.Timer(lambda: fn(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(5, number)) / number * 1e6
+
+
+def main() -> None:
+    results = []
+    for name, (model, content) in payloads().items():
+        assert json.loads(before(content)) == json.loads(after(model, content)), name
+        old, new = measure(before, content), measure(after, model, content)
+        results.append({"endpoint": name, "before_us": round(old, 1), "after_us": round(new, 1),
+                        "speedup": round(old / new, 1), "bytes": len(after(model, content))})
+
+    if "--json" in sys.argv:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'endpoint':<18}{'before (us)':>12}{'after (us)':>12}{'speedup':>9}{'bytes':>9}")
+    for r in results:
+        print(f"{r['endpoint']:<18}{r['before_us']:>12}{r['after_us']:>12}{r['speedup']:>8}x{r['bytes']:>9}")
+
+
+if __name__ == "__main__":
+    main()
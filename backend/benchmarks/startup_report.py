@@ -0,0 +1,186 @@
+"""Cold-start report for the backend: import cost, time to first response and memory.
+
+Lists the slowest imports of "import main" (python -X importtime), then
+starts uvicorn against the stub Open-Meteo server and measures the time
+until the first dashboard request succeeds, and the server's memory right
+then and once the background warm-up has finished. The probe leaves out
+"timezone", so it goes through the resolver while the warm-up is still
+importing, and any 5xx answer fails the report. PSS counts pages shared
+with other processes (the mapped data files, shared libraries)
+fractionally, so it is the figure that adds up across workers. Pass an
+earlier report as --baseline (e.g. one taken on the parent commit) to
+print the measured differences. Run from the backend directory:
+
+    python benchmarks/startup_report.py [--top 15] [--output startup.json] [--baseline old.json]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from corpus import CASES  # noqa: E402
+from stub_open_meteo import start_stub  # noqa: E402
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+TIDE_STATIONS_EXAMPLE = os.path.join(BACKEND_DIR, "data", "tide_stations.example.json")
+
+
+def import_times(top: int) -> dict:
+    """Total "import main" time and the ``top`` imports by cumulative time, in milliseconds."""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    total = (time.perf_counter() - started) * 1000
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, name[1:].rstrip()))
+    # Only top-level entries of the import tree (nested ones are indented),
+    # so parents don't repeat their children
+    roots = sorted(((ms, name) for ms, name in rows if not name.startswith(" ")), reverse=True)
+    return {"process_ms": round(total, 1),
+            "top": [{"module": name, "cumulative_ms": round(ms, 1)} for ms, name in roots[:top]]}
+
+
+def memory_mb(pid: int) -> dict:
+    """RSS and PSS of a process in MiB, from /proc (empty elsewhere)."""
+    memory = {}
+    for path, key, field in ((f"/proc/{pid}/status", "rss_mb", "VmRSS:"),
+                             (f"/proc/{pid}/smaps_rollup", "pss_mb", "Pss:")):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(field):
+                        memory[key] = round(int(line.split()[1]) / 1024, 1)
+                        break
+        except OSError:
+            pass
+    return memory
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url: str, timeout: float = 30.0):
+    with urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def serve_report(timeout: float) -> dict:
+    """Start uvicorn and time the first successful dashboard request."""
+    stub, stub_url = start_stub()
+    port = free_port()
+    env = {**os.environ,
+           "OPEN_METEO_MARINE_URL": f"{stub_url}/v1/marine",
+           "OPEN_METEO_FORECAST_URL": f"{stub_url}/v1/forecast",
+           "WEATHER_PROVIDER": "open-meteo"}
+    env.setdefault("TIDE_STATIONS_PATH", TIDE_STATIONS_EXAMPLE)
+    case = CASES[0]
+    url = f"http://127.0.0.1:{port}/api/v1/dashboard?" + urlencode(
+        {"lat": case.lat, "lng": case.lng, "date": case.date.isoformat()})
+
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                              cwd=BACKEND_DIR, env=env)
+    try:
+        listening = None
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"no response within {timeout}s")
+            if listening is None:
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                    listening = time.perf_counter() - started
+                except OSError:
+                    time.sleep(0.01)
+                    continue
+            try:
+                get_json(url)
+                break
+            except HTTPError as exc:
+                # The port is open, so any error answer is the app's, not a startup race
+                raise RuntimeError(f"first dashboard request failed: HTTP {exc.code} {exc.read()[:200]!r}")
+            except (URLError, OSError):
+                time.sleep(0.01)
+        first_response = time.perf_counter() - started
+        at_first_response = memory_mb(server.pid)
+
+        while True:
+            startup = get_json(f"http://127.0.0.1:{port}/api/v1/cache/stats")["startup"]
+            if startup["warmed"]:
+                break
+            if startup["error"]:
+                raise RuntimeError(f"warm-up failed: {startup['error']}")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"warm-up did not finish within {timeout}s")
+            time.sleep(0.05)
+        return {
+            "listening_ms": round(listening * 1000, 1),
+            "first_dashboard_ms": round(first_response * 1000, 1),
+            "warm_up_ms": startup["warm_up_ms"],
+            "memory_at_first_response": at_first_response,
+            "memory_warm": memory_mb(server.pid),
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        stub.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="imports to list")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for the server")
+    parser.add_argument("--output", help="also write the report as JSON")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    args = parser.parse_args()
+
+    report = {"imports": import_times(args.top), "serve": serve_report(args.timeout)}
+
+    imports, serve = report["imports"], report["serve"]
+    print(f"python -c 'import main': {imports['process_ms']} ms")
+    width = max(len(row["module"]) for row in imports["top"])
+    for row in imports["top"]:
+        print(f"  {row['module']:<{width}}{row['cumulative_ms']:>10} ms")
+    print()
+    for label, key in (("port open", "listening_ms"), ("first dashboard", "first_dashboard_ms"),
+                       ("background warm-up", "warm_up_ms")):
+        print(f"{label:<20}{serve[key]:>10} ms")
+    for label, key in (("at first response", "memory_at_first_response"), ("after warm-up", "memory_warm")):
+        memory = serve[key]
+        print(f"memory {label}: " + (", ".join(f"{k[:-3].upper()} {v} MiB" for k, v in memory.items()) or "n/a"))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            old = json.load(f)
+        print(f"\nagainst {args.baseline}:")
+        for label, before, after in (
+            ("import main", old["imports"]["process_ms"], imports["process_ms"]),
+            ("port open", old["serve"]["listening_ms"], serve["listening_ms"]),
+            ("first dashboard", old["serve"]["first_dashboard_ms"], serve["first_dashboard_ms"]),
+        ):
+            print(f"{label:<20}{before:>10} ms ->{after:>10} ms ({after - before:+.1f} ms, {after / before - 1:+.0%})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
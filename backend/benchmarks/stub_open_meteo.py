@@ -0,0 +1,87 @@
+"""Local stand-in for the Open-Meteo marine and forecast APIs.
+
+Answers "current" and hourly ("timeformat=unixtime") requests with
+deterministic values for whatever variables were asked for, optionally
+after a fixed delay, so endpoint benchmarks measure the app rather than
+the network. Serve it on its own with:
+
+    python benchmarks/stub_open_meteo.py [--port 8081] [--delay-ms 0]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def value(name: str, hour: int = 0) -> float:
+    """A plausible, deterministic value for an Open-Meteo variable."""
+    if "direction" in name:
+        return float((200 + 7 * hour) % 360)
+    if "period" in name:
+        return 7.5
+    if "height" in name:
+        return 1.2 + 0.1 * (hour % 6)
+    if name == "visibility":
+        return 24000.0
+    if name == "temperature_2m":
+        return 18.0 + 4 * ((hour % 24) / 24)
+    return 6.0 + (hour % 5)
+
+
+def document(query: dict) -> dict:
+    doc = {"latitude": float(query["latitude"][0]), "longitude": float(query["longitude"][0])}
+    if "current" in query:
+        doc["current"] = {name: value(name) for name in query["current"][0].split(",")}
+    if "hourly" in query:
+        past_days = int(query.get("past_days", ["0"])[0])
+        days = int(query.get("forecast_days", ["7"])[0])
+        start = int(time.time() // 86400 - past_days) * 86400
+        hours = range((past_days + days) * 24)
+        doc["hourly"] = {"time": [start + 3600 * h for h in hours]}
+        for name in query["hourly"][0].split(","):
+            doc["hourly"][name] = [value(name, h) for h in hours]
+    return doc
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path not in ("/v1/marine", "/v1/forecast"):
+            self.send_error(404)
+            return
+        if self.delay:
+            time.sleep(self.delay)
+        body = json.dumps(document(parse_qs(url.query))).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(port: int = 0, delay_ms: float = 0.0) -> tuple:
+    """Serve the stub on a background thread; returns (server, base URL)."""
+    handler = type("Handler", (StubHandler,), {"delay": delay_ms / 1000})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server, url = start_stub(args.port, args.delay_ms)
+    print(f"OPEN_METEO_MARINE_URL={url}/v1/marine OPEN_METEO_FORECAST_URL={url}/v1/forecast")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
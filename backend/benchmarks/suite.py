@@ -0,0 +1,264 @@
+"""Benchmark suite for the astronomy, prayer, tide and weather services and the /api/v1 endpoints.
+
+Micro-benchmarks time each service function on every case in corpus.py.
+Endpoint benchmarks drive the app in-process through httpx's ASGI
+transport, with Open-Meteo replaced by the local stub server, so they
+measure routing, computation, caching and serialization but not the
+network. Results are written as JSON; runs can be compared against a
+baseline file and checked against the budgets in budgets.json, and the
+exit status is non-zero when either check fails. Run from the backend
+directory:
+
+    python benchmarks/suite.py [--output results.json] [--baseline old.json]
+                               [--budgets benchmarks/budgets.json] [--only services|endpoints]
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from corpus import CASES, ROUTE  # noqa: E402
+from stub_open_meteo import start_stub  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGETS_PATH = os.path.join(BENCH_DIR, "budgets.json")
+TIDE_STATIONS_EXAMPLE = os.path.join(BENCH_DIR, "..", "data", "tide_stations.example.json")
+
+
+def measure(fn, *args, repeat: int = 5) -> float:
+    """Best-of-``repeat`` mean time per call in microseconds."""
+    timer = timeit.Timer(lambda: fn(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def service_benchmarks(repeat: int) -> dict:
+    import numpy as np
+    from services.almanac import calculate_almanac
+    from services.astronomy import (
+        calculate_lunar,
+        calculate_solar,
+        calculate_solar_fast,
+        get_timezone_from_coords,
+        lunar_cache
+    )
+    from services.prayer_times import calculate_prayer_times, calculate_prayer_times_array, timezone_offsets
+    from services.tides import predict_tides
+    from services.weather_client import build_weather
+
+    def lunar_uncached(lat, lng, day, tz):
+        # The global part is cached per date; time the full computation
+        lunar_cache.clear()
+        return calculate_lunar(lat, lng, day, tz)
+
+    per_case = {
+        "calculate_solar": calculate_solar,
+        "calculate_solar_fast": calculate_solar_fast,
+        "calculate_lunar": lunar_uncached,
+        "calculate_prayer_times": calculate_prayer_times,
+        "get_timezone_from_coords": lambda lat, lng, day, tz: get_timezone_from_coords(lat, lng),
+        "predict_tides": predict_tides,
+        "calculate_almanac_30d": lambda lat, lng, day, tz: calculate_almanac(lat, lng, day, day + timedelta(days=29), tz),
+    }
+    results = {}
+    for name, fn in per_case.items():
+        for case in CASES:
+            us = measure(fn, case.lat, case.lng, case.date, case.timezone, repeat=repeat)
+            results[f"service.{name}[{case.name}]"] = {"us": round(us, 1)}
+
+    # The whole corpus as one array call, repeated to 1000 points
+    n = 1000
+    lats = np.resize([c.lat for c in CASES], n)
+    lngs = np.resize([c.lng for c in CASES], n)
+    dates = np.resize(np.array([c.date for c in CASES], dtype="datetime64[D]"), n)
+    offsets = timezone_offsets(dates, np.resize([c.timezone for c in CASES], n))
+    results[f"service.calculate_prayer_times_array[{n}]"] = {
+        "us": round(measure(calculate_prayer_times_array, lats, lngs, dates, offsets, repeat=repeat), 1)
+    }
+
+    marine = {"current": {"wave_height": 1.2, "wave_period": 6.5, "swell_wave_height": 0.8,
+                          "swell_wave_period": 11.0, "swell_wave_direction": 250}}
+    weather = {"current": {"temperature_2m": 24.3, "visibility": 24000, "wind_speed_10m": 6.2,
+                           "wind_direction_10m": 280, "wind_gusts_10m": 9.1}}
+    results["service.build_weather"] = {"us": round(measure(build_weather, marine, weather, repeat=repeat), 1)}
+    return results
+
+
+def endpoint_requests() -> list:
+    """(name, method, path, params for a case, JSON body for a case)."""
+    def point(case, **extra):
+        return {"lat": case.lat, "lng": case.lng, "timezone": case.timezone, **extra}
+
+    def dated(case, **extra):
+        return point(case, date=case.date.isoformat(), **extra)
+
+    return [
+        ("dashboard", "GET", "/api/v1/dashboard", dated, None),
+        ("dashboard_today", "GET", "/api/v1/dashboard", point, None),
+        ("dashboard_stream", "GET", "/api/v1/dashboard/stream", dated, None),
+        ("dashboard_batch_50", "POST", "/api/v1/dashboard/batch", None, lambda case: {
+            "items": [{"lat": case.lat + k * 0.01, "lng": case.lng, "date": case.date.isoformat(),
+                       "timezone": case.timezone} for k in range(50)]
+        }),
+        ("solar", "GET", "/api/v1/solar", dated, None),
+        ("prayer", "GET", "/api/v1/prayer", dated, None),
+        ("lunar", "GET", "/api/v1/lunar", dated, None),
+        ("tides", "GET", "/api/v1/tides", lambda case: dated(case, days=3), None),
+        ("almanac_30d", "GET", "/api/v1/almanac", lambda case: point(case, start=case.date.isoformat()), None),
+        ("weather", "GET", "/api/v1/weather", point, None),
+        ("weather_forecast", "GET", "/api/v1/weather/forecast", lambda case: point(case, hours=48), None),
+        ("voyage", "POST", "/api/v1/voyage", None, lambda case: {
+            "waypoints": [{"lat": lat, "lng": lng, "speed": knots} for lat, lng, knots in ROUTE],
+            "departure": datetime.combine(case.date, datetime.min.time(), timezone.utc).isoformat()
+        }),
+    ]
+
+
+async def endpoint_benchmarks(iterations: int) -> dict:
+    import httpx
+    import main
+    from services.startup import startup_stats
+
+    results = {}
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Cold requests race the app's own background warm-up, as on a fresh
+            # deploy, and leave out "timezone" so they go through the resolver
+            for case in CASES:
+                response = await client.get("/api/v1/dashboard", params={
+                    "lat": case.lat, "lng": case.lng, "date": case.date.isoformat()
+                })
+                if response.status_code != 200:
+                    raise RuntimeError(f"cold dashboard [{case.name}]: HTTP {response.status_code} "
+                                       f"{response.text[:200]}")
+            # Timing starts once the warm-up has finished
+            while not startup_stats()["warmed"]:
+                if startup_stats()["error"]:
+                    raise RuntimeError(f"warm-up failed: {startup_stats()['error']}")
+                await asyncio.sleep(0.05)
+
+            for name, method, path, params, body in endpoint_requests():
+                async def call(case):
+                    response = await client.request(
+                        method, path,
+                        params=params(case) if params else None,
+                        json=body(case) if body else None
+                    )
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{name} [{case.name}]: HTTP {response.status_code} {response.text[:200]}")
+
+                # One warm-up pass over the corpus, then cycle through it
+                for case in CASES:
+                    await call(case)
+                timings = []
+                for i in range(iterations):
+                    started = time.perf_counter()
+                    await call(CASES[i % len(CASES)])
+                    timings.append((time.perf_counter() - started) * 1e6)
+                timings.sort()
+                results[f"endpoint.{name}"] = {
+                    "us": round(timings[len(timings) // 2], 1),
+                    "mean_us": round(sum(timings) / len(timings), 1),
+                    "p95_us": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1),
+                    "requests": len(timings),
+                }
+    return results
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=BENCH_DIR, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "astronomy_executor": os.environ.get("ASTRONOMY_EXECUTOR", "thread"),
+    }
+
+
+def check_budgets(results: dict, budgets: dict) -> list:
+    """Results whose primary time exceeds the budget of any pattern they match."""
+    failures = []
+    for name, result in results.items():
+        for pattern, limit in budgets.items():
+            if fnmatch.fnmatchcase(name, pattern) and result["us"] > limit:
+                failures.append(f"{name}: {result['us']}us over budget {limit}us ({pattern})")
+    return failures
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    """Results slower than the baseline run by more than ``max_regression``."""
+    failures = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old and old["us"] > 0 and result["us"] > old["us"] * (1 + max_regression):
+            failures.append(f"{name}: {old['us']}us -> {result['us']}us (+{result['us'] / old['us'] - 1:.0%})")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed slowdown vs the baseline")
+    parser.add_argument("--budgets", default=BUDGETS_PATH)
+    parser.add_argument("--only", choices=("services", "endpoints"))
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats per micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--upstream-delay-ms", type=float, default=0.0, help="stub Open-Meteo latency")
+    args = parser.parse_args()
+
+    # Point the app at the stub and the example tide station before anything imports it
+    stub, url = start_stub(delay_ms=args.upstream_delay_ms)
+    os.environ["OPEN_METEO_MARINE_URL"] = f"{url}/v1/marine"
+    os.environ["OPEN_METEO_FORECAST_URL"] = f"{url}/v1/forecast"
+    os.environ["WEATHER_PROVIDER"] = "open-meteo"
+    os.environ.setdefault("TIDE_STATIONS_PATH", TIDE_STATIONS_EXAMPLE)
+
+    results = {}
+    try:
+        if args.only != "endpoints":
+            results.update(service_benchmarks(args.repeat))
+        if args.only != "services":
+            results.update(asyncio.run(endpoint_benchmarks(args.iterations)))
+    finally:
+        stub.shutdown()
+
+    with open(args.output, "w") as f:
+        json.dump({"meta": metadata(), "results": results}, f, indent=2)
+
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}{'us':>12}{'p95 us':>12}")
+    for name, result in results.items():
+        print(f"{name:<{width}}{result['us']:>12}{result.get('p95_us', ''):>12}")
+    print(f"\nwrote {args.output}")
+
+    failures = []
+    if args.budgets and os.path.exists(args.budgets):
+        with open(args.budgets) as f:
+            failures += check_budgets(results, json.load(f))
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures += compare(results, json.load(f)["results"], args.max_regression)
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
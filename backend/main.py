@@ -1,21 +1,94 @@
-from fastapi import FastAPI, Query
+import asyncio
+from contextlib import asynccontextmanager
+import time
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import date, datetime
-from typing import Optional
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from datetime import date, datetime, timedelta
+from typing import Literal, Optional
 
 from services.astronomy import (
     get_timezone_from_coords,
-    calculate_solar,
+    SOLAR_MODES,
     calculate_lunar,
-    calculate_tides
+    calculate_tides,
+    calculate_astronomy,
+    calculate_astronomy_batch
 )
+from services.timezones import timezone_index_stats
+from services.live import LiveSession, live_stats, LIVE_TICK_S
+from services.voyage import VoyageTrack, calculate_voyage, utc_isoformat, MAX_VOYAGE_DAYS
+from services.almanac import calculate_almanac, MAX_ALMANAC_DAYS
+from services.tides import predict_tides, MAX_TIDE_DAYS
 from services.prayer_times import calculate_prayer_times, METHODS
-from services.weather_client import fetch_marine_weather
+from services.weather_client import (
+    close_client,
+    weather_cache_key,
+    weather_flight
+)
+from services.weather_provider import fetch_marine_weather, fetch_forecast, get_provider
+from services.forecast import (
+    forecast_hours,
+    local_timestamp,
+    weather_at,
+    MAX_FORECAST_HOURS
+)
+from services.http_cache import (
+    astronomy_cache_control,
+    conditional,
+    is_pinned,
+    make_etag,
+    weather_cache_control,
+    weather_etag,
+    EXPOSED_HEADERS
+)
+from services.cache import all_cache_stats
+from services.metrics import TimingMiddleware, render_metrics, stage
+from services.profiling import ProfilingMiddleware, profiling_stats
+from services.singleflight import SingleFlight
+from services.startup import startup_stats, warm_up
+from services.executor import run_in_pool, start_executor, shutdown_executor, ASTRONOMY_WORKERS
+from models.schemas import (
+    AlmanacResponse,
+    BatchDashboardRequest,
+    BatchDashboardResponse,
+    DashboardResponse,
+    LiveFix,
+    LunarData,
+    PrayerData,
+    SolarData,
+    TideData,
+    TidesResponse,
+    VoyageRequest,
+    VoyageResponse,
+    WeatherData,
+    WeatherForecastResponse
+)
+from models.responses import FastJSONResponse, dumps, typed_response
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Astronomy worker pool for the lifetime of the app
+    start_executor()
+    weather_provider = get_provider()
+    await weather_provider.start()
+    # The upstream client, heavy imports and shared data load in the
+    # background so the port opens straight away; lookups work meanwhile
+    warm_task = asyncio.ensure_future(warm_up())
+    yield
+    warm_task.cancel()
+    await weather_provider.stop()
+    await close_client()
+    shutdown_executor()
+
 
 app = FastAPI(
     title="NavApp API",
     description="Ocean Navigator Daily Productivity App API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware for frontend
@@ -25,80 +98,393 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=EXPOSED_HEADERS,
 )
 
+# Token-guarded per-request profiling; a no-op unless PROFILE_TOKEN is set
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so Server-Timing's total covers the whole request
+app.add_middleware(TimingMiddleware)
+
+# Identical concurrent dashboard requests share one computation
+dashboard_flight = SingleFlight("dashboard")
+
+
+def parse_date(date_str: Optional[str]) -> date:
+    """Parse a YYYY-MM-DD date, falling back to today."""
+    if date_str:
+        try:
+            return datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            pass
+    return date.today()
+
 
 @app.get("/")
 async def root():
     return {"message": "NavApp API is running", "version": "1.0.0"}
 
 
-@app.get("/api/v1/dashboard")
+@app.get("/api/v1/dashboard", response_model=DashboardResponse)
 async def get_dashboard(
+    request: Request,
+    response: Response,
     lat: float = Query(..., ge=-90, le=90),
     lng: float = Query(..., ge=-180, le=180),
     date_str: Optional[str] = Query(None, alias="date"),
     timezone: Optional[str] = Query(None),
-    prayer_method: str = Query("muslim_world_league")
+    prayer_method: str = Query("muslim_world_league"),
+    mode: Literal["precise", "fast"] = Query("precise")
 ):
     """Get all navigation data in a single response."""
 
-    # Parse date or use today
-    if date_str:
+    target_date = parse_date(date_str)
+    current = target_date == date.today()
+
+    # The astronomy half is fixed for a pinned date; the weather half is tagged
+    # by the weather actually served
+    astronomy_etag = make_etag("astronomy", lat, lng, target_date, timezone, prayer_method, mode)
+    astronomy_control = astronomy_cache_control(is_pinned(date_str, target_date))
+
+    def conditional_dashboard(weather: Optional[dict], fresh: bool) -> Optional[Response]:
+        weather_tag = weather_etag(weather)
+        weather_control = weather_cache_control(weather, fresh, current)
+        return conditional(
+            request, response, make_etag(astronomy_etag, weather_tag), weather_control,
+            X_Astronomy_ETag=astronomy_etag, X_Astronomy_Cache_Control=astronomy_control,
+            X_Weather_ETag=weather_tag, X_Weather_Cache_Control=weather_control
+        )
+
+    # Skip the astronomy when the weather that would be served is already cached
+    # and the client holds this exact version
+    served = await cached_weather(lat, lng, target_date, timezone)
+    if served is not None:
+        not_modified = conditional_dashboard(*served)
+        if not_modified:
+            return not_modified
+
+    key = (lat, lng, target_date, timezone, prayer_method, mode)
+    dashboard = await dashboard_flight.do(key, build_dashboard, *key)
+    weather = dashboard["weather"]
+    not_modified = conditional_dashboard(weather, weather_is_fresh(lat, lng, current, weather))
+    if not_modified:
+        return not_modified
+    return typed_response(DashboardResponse, dashboard, response)
+
+
+# Schema for each streamed dashboard section
+STREAM_SECTIONS = {
+    "meta": None,
+    "solar": SolarData,
+    "prayer": PrayerData,
+    "lunar": LunarData,
+    "tides": TideData,
+    "weather": WeatherData,
+}
+
+
+@app.get("/api/v1/dashboard/stream")
+async def stream_dashboard(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    date_str: Optional[str] = Query(None, alias="date"),
+    timezone: Optional[str] = Query(None),
+    prayer_method: str = Query("muslim_world_league"),
+    mode: Literal["precise", "fast"] = Query("precise"),
+    format: Literal["ndjson", "sse"] = Query("ndjson")
+):
+    """Stream the dashboard section by section as each is ready, weather last.
+
+    Every event carries the section name, its compute time and the time
+    since the request started, as NDJSON lines or Server-Sent Events.
+    """
+    started = time.perf_counter()
+    target_date = parse_date(date_str)
+    current = target_date == date.today()
+    weather_task = asyncio.ensure_future(fetch_marine_weather(lat, lng) if current else fetch_forecast(lat, lng))
+    tasks = [weather_task]
+
+    async def timed(fn, *args):
+        t0 = time.perf_counter()
+        result = await run_in_pool(fn, *args)
+        return result, time.perf_counter() - t0
+
+    def event(section: str, data, duration: float) -> bytes:
+        model = STREAM_SECTIONS[section]
+        payload = dumps({
+            "section": section,
+            "duration_ms": round(duration * 1000, 1),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            "data": model.model_validate(data).model_dump(mode="json") if model and data is not None else data
+        })
+        if format == "sse":
+            return b"event: " + section.encode() + b"\ndata: " + payload + b"\n\n"
+        return payload + b"\n"
+
+    async def events():
         try:
-            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            target_date = date.today()
-    else:
-        target_date = date.today()
-
-    # Get timezone from coordinates if not provided
-    if not timezone:
-        timezone = get_timezone_from_coords(lat, lng)
-
-    # Calculate all data
-    solar = calculate_solar(lat, lng, target_date, timezone)
-    prayer = calculate_prayer_times(lat, lng, target_date, timezone, prayer_method)
-    lunar = calculate_lunar(lat, lng, target_date, timezone)
-    tides = calculate_tides(lunar["illumination"])
-    weather = await fetch_marine_weather(lat, lng)
+            t0 = time.perf_counter()
+            resolved = await resolve_timezone(lat, lng, timezone)
+            yield event("meta", {
+                "coordinates": {"lat": lat, "lng": lng},
+                "date": target_date.isoformat(),
+                "timezone": resolved
+            }, time.perf_counter() - t0)
+
+            names = {}
+            for name, fn, args in (
+                ("solar", SOLAR_MODES[mode], (lat, lng, target_date, resolved)),
+                ("prayer", calculate_prayer_times, (lat, lng, target_date, resolved, prayer_method)),
+                ("lunar", calculate_lunar, (lat, lng, target_date, resolved)),
+            ):
+                task = asyncio.ensure_future(timed(fn, *args))
+                names[task] = name
+                tasks.append(task)
+
+            # Flush sections in completion order; tides only need the lunar illumination
+            pending = set(names)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    data, duration = task.result()
+                    yield event(names[task], data, duration)
+                    if names[task] == "lunar":
+                        t0 = time.perf_counter()
+                        yield event("tides", calculate_tides(data["illumination"]), time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            weather = await weather_task
+            if not current:
+                weather = weather_at(weather, local_timestamp(target_date, FORECAST_HOUR, resolved))
+            yield event("weather", weather, time.perf_counter() - t0)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    # Don't let proxies buffer the stream into one late response
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type=media_type, headers=headers)
+
+
+@app.websocket("/api/v1/live")
+async def live_feed(
+    websocket: WebSocket,
+    prayer_method: str = Query("muslim_world_league"),
+    mode: Literal["precise", "fast"] = Query("fast")
+):
+    """Live dashboard for a moving vessel.
+
+    The client sends GPS fixes as {"lat", "lng"} JSON messages. The first
+    fix is answered with a full snapshot; later ones with a JSON merge
+    patch of whatever sections changed, and nothing when none did.
+    """
+    await websocket.accept()
+    session = LiveSession(prayer_method, mode)
+    fix = None
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive_json(), LIVE_TICK_S if fix else None)
+            except asyncio.TimeoutError:
+                # No new fix: still pick up a date rollover or a new weather slot
+                message = None
+            except (KeyError, ValueError):
+                # Binary frames have no "text" (KeyError); JSONDecodeError is a ValueError
+                await websocket.send_text(dumps({"type": "error", "detail": "fixes must be JSON text frames"}).decode())
+                continue
+            if message is not None:
+                try:
+                    fix = LiveFix.model_validate(message)
+                except ValueError as exc:
+                    await websocket.send_text(dumps({"type": "error", "detail": str(exc)}).decode())
+                    continue
+
+            first = not session.state
+            patch = await session.update(fix.lat, fix.lng)
+            if patch:
+                kind = "snapshot" if first else "patch"
+                await websocket.send_text(dumps({"type": kind, "data": patch}).decode())
+    except WebSocketDisconnect:
+        pass
+
+
+async def resolve_timezone(lat: float, lng: float, timezone: Optional[str]) -> str:
+    """Use the given timezone, or look it up from coordinates off the event loop."""
+    if timezone:
+        return timezone
+    return await run_in_pool(get_timezone_from_coords, lat, lng)
+
+
+# Local hour whose forecast represents a dashboard for another day
+FORECAST_HOUR = 12
+
+
+async def cached_weather(lat: float, lng: float, target_date: date, timezone: Optional[str]) -> Optional[tuple]:
+    """(weather, fresh) a dashboard would carry right now without any upstream I/O, or None."""
+    provider = get_provider()
+    if target_date == date.today():
+        return provider.cached_current(lat, lng)
+    forecast = provider.cached_forecast(lat, lng)
+    if forecast is None:
+        return None
+    timezone = await resolve_timezone(lat, lng, timezone)
+    return weather_at(forecast, local_timestamp(target_date, FORECAST_HOUR, timezone)), True
+
+
+def weather_is_fresh(lat: float, lng: float, current: bool, weather: Optional[dict]) -> bool:
+    """Whether served weather is for the current upstream slot, not last slot's served stale."""
+    if weather is None or not current:
+        return weather is not None
+    cached = get_provider().cached_current(lat, lng)
+    return cached is not None and cached[1] and cached[0] == weather
+
+
+async def build_dashboard(lat: float, lng: float, target_date: date, timezone: Optional[str],
+                          prayer_method: str, mode: str = "precise") -> dict:
+    """Compute the full dashboard payload."""
+    # Today shows current conditions; other dates read the cell's hourly forecast.
+    # Weather I/O runs while the astronomy is computed in the worker pool.
+    current = target_date == date.today()
+    weather_task = asyncio.ensure_future(fetch_marine_weather(lat, lng) if current else fetch_forecast(lat, lng))
+    try:
+        timezone = await resolve_timezone(lat, lng, timezone)
+        with stage("astronomy"):
+            astronomy = await run_in_pool(calculate_astronomy, lat, lng, target_date, timezone, prayer_method, mode)
+        # Only the part of the weather fetch not hidden behind the astronomy
+        with stage("weather_wait"):
+            weather = await weather_task
+    finally:
+        weather_task.cancel()
+    if not current:
+        weather = weather_at(weather, local_timestamp(target_date, FORECAST_HOUR, timezone))
 
     return {
         "coordinates": {"lat": lat, "lng": lng},
         "date": target_date.isoformat(),
         "timezone": timezone,
-        "solar": solar,
-        "prayer": prayer,
-        "lunar": lunar,
-        "tides": tides,
+        "solar": astronomy["solar"],
+        "prayer": astronomy["prayer"],
+        "lunar": astronomy["lunar"],
+        "tides": astronomy["tides"],
         "weather": weather
     }
 
 
-@app.get("/api/v1/solar")
+def resolve_timezones(coords: list) -> dict:
+    """Look up the timezone for each distinct coordinate pair."""
+    return {(lat, lng): get_timezone_from_coords(lat, lng) for lat, lng in coords}
+
+
+# Upstream weather calls a single batch request may have open at once
+BATCH_WEATHER_CONCURRENCY = 8
+
+
+@app.post("/api/v1/dashboard/batch", response_model=BatchDashboardResponse)
+async def get_dashboard_batch(request: BatchDashboardRequest, stream: bool = Query(False)):
+    """Get dashboards for many positions/dates, sharing work between items."""
+    items = [
+        (item.lat, item.lng, parse_date(item.date), item.timezone, item.prayer_method)
+        for item in request.items
+    ]
+
+    # One weather fetch per grid cell, started before the astronomy
+    semaphore = asyncio.Semaphore(BATCH_WEATHER_CONCURRENCY)
+
+    today = date.today()
+
+    async def fetch_cell(lat: float, lng: float, current: bool):
+        async with semaphore:
+            return await (fetch_marine_weather(lat, lng) if current else fetch_forecast(lat, lng))
+
+    def weather_key(lat: float, lng: float, target_date: date) -> tuple:
+        return (target_date == today, *weather_cache_key(lat, lng))
+
+    weather_tasks = {}
+    chunk_tasks = []
+
+    def cancel_pending() -> None:
+        for task in [*chunk_tasks, *weather_tasks.values()]:
+            task.cancel()
+
+    for lat, lng, target_date, *_ in items:
+        cell = weather_key(lat, lng, target_date)
+        if cell not in weather_tasks:
+            weather_tasks[cell] = asyncio.ensure_future(fetch_cell(lat, lng, cell[0]))
+
+    try:
+        # One timezone lookup per distinct coordinate
+        missing = list(dict.fromkeys((lat, lng) for lat, lng, _, tz, _ in items if not tz))
+        timezones = await run_in_pool(resolve_timezones, missing) if missing else {}
+        keys = [(lat, lng, d, tz or timezones[(lat, lng)], method) for lat, lng, d, tz, method in items]
+
+        # One astronomy computation per distinct item, spread over the pool in chunks
+        unique = list(dict.fromkeys(keys))
+        size = max(1, -(-len(unique) // ASTRONOMY_WORKERS))
+        chunks = [unique[i:i + size] for i in range(0, len(unique), size)]
+        chunk_tasks.extend(asyncio.ensure_future(run_in_pool(calculate_astronomy_batch, chunk, request.mode)) for chunk in chunks)
+        chunk_of = {key: (n // size, n % size) for n, key in enumerate(unique)}
+    except BaseException:
+        cancel_pending()
+        raise
+
+    async def result(index: int) -> dict:
+        lat, lng, target_date, timezone, _ = key = keys[index]
+        chunk, offset = chunk_of[key]
+        astronomy = (await chunk_tasks[chunk])[offset]
+        weather = await weather_tasks[weather_key(lat, lng, target_date)]
+        if target_date != today:
+            weather = weather_at(weather, local_timestamp(target_date, FORECAST_HOUR, timezone))
+        return {
+            "coordinates": {"lat": lat, "lng": lng},
+            "date": target_date.isoformat(),
+            "timezone": timezone,
+            **astronomy,
+            "weather": weather
+        }
+
+    if stream:
+        async def lines():
+            try:
+                for index in range(len(keys)):
+                    yield dumps(DashboardResponse.model_validate(await result(index))) + b"\n"
+            finally:
+                cancel_pending()
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    try:
+        return typed_response(BatchDashboardResponse, {"results": [await result(index) for index in range(len(keys))]})
+    finally:
+        cancel_pending()
+
+
+@app.get("/api/v1/solar", response_model=SolarData)
 async def get_solar(
+    request: Request,
+    response: Response,
     lat: float = Query(..., ge=-90, le=90),
     lng: float = Query(..., ge=-180, le=180),
     date_str: Optional[str] = Query(None, alias="date"),
-    timezone: Optional[str] = Query(None)
+    timezone: Optional[str] = Query(None),
+    mode: Literal["precise", "fast"] = Query("precise")
 ):
     """Get sunrise, sunset, and twilight times."""
-    if date_str:
-        try:
-            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            target_date = date.today()
-    else:
-        target_date = date.today()
-
-    if not timezone:
-        timezone = get_timezone_from_coords(lat, lng)
+    target_date = parse_date(date_str)
+    etag = make_etag("solar", lat, lng, target_date, timezone, mode)
+    not_modified = conditional(request, response, etag, astronomy_cache_control(is_pinned(date_str, target_date)))
+    if not_modified:
+        return not_modified
 
-    return calculate_solar(lat, lng, target_date, timezone)
+    timezone = await resolve_timezone(lat, lng, timezone)
+    return typed_response(SolarData, await run_in_pool(SOLAR_MODES[mode], lat, lng, target_date, timezone), response)
 
 
-@app.get("/api/v1/prayer")
+@app.get("/api/v1/prayer", response_model=PrayerData)
 async def get_prayer(
+    request: Request,
+    response: Response,
     lat: float = Query(..., ge=-90, le=90),
     lng: float = Query(..., ge=-180, le=180),
     date_str: Optional[str] = Query(None, alias="date"),
@@ -106,18 +492,15 @@ async def get_prayer(
     method: str = Query("muslim_world_league")
 ):
     """Get Islamic prayer times."""
-    if date_str:
-        try:
-            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            target_date = date.today()
-    else:
-        target_date = date.today()
-
-    if not timezone:
-        timezone = get_timezone_from_coords(lat, lng)
+    target_date = parse_date(date_str)
+    etag = make_etag("prayer", lat, lng, target_date, timezone, method)
+    not_modified = conditional(request, response, etag, astronomy_cache_control(is_pinned(date_str, target_date)))
+    if not_modified:
+        return not_modified
 
-    return calculate_prayer_times(lat, lng, target_date, timezone, method)
+    timezone = await resolve_timezone(lat, lng, timezone)
+    prayer = await run_in_pool(calculate_prayer_times, lat, lng, target_date, timezone, method)
+    return typed_response(PrayerData, prayer, response)
 
 
 @app.get("/api/v1/prayer/methods")
@@ -126,58 +509,205 @@ async def get_prayer_methods():
     return {key: value["name"] for key, value in METHODS.items()}
 
 
-@app.get("/api/v1/lunar")
+@app.get("/api/v1/lunar", response_model=LunarData)
 async def get_lunar(
+    request: Request,
+    response: Response,
     lat: float = Query(..., ge=-90, le=90),
     lng: float = Query(..., ge=-180, le=180),
     date_str: Optional[str] = Query(None, alias="date"),
     timezone: Optional[str] = Query(None)
 ):
     """Get moon phase and moonrise/moonset times."""
-    if date_str:
-        try:
-            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            target_date = date.today()
-    else:
-        target_date = date.today()
+    target_date = parse_date(date_str)
+    etag = make_etag("lunar", lat, lng, target_date, timezone)
+    not_modified = conditional(request, response, etag, astronomy_cache_control(is_pinned(date_str, target_date)))
+    if not_modified:
+        return not_modified
 
-    if not timezone:
-        timezone = get_timezone_from_coords(lat, lng)
+    timezone = await resolve_timezone(lat, lng, timezone)
+    return typed_response(LunarData, await run_in_pool(calculate_lunar, lat, lng, target_date, timezone), response)
 
-    return calculate_lunar(lat, lng, target_date, timezone)
 
-
-@app.get("/api/v1/tides")
+@app.get("/api/v1/tides", response_model=TidesResponse)
 async def get_tides(
+    request: Request,
+    response: Response,
     lat: float = Query(..., ge=-90, le=90),
     lng: float = Query(..., ge=-180, le=180),
     date_str: Optional[str] = Query(None, alias="date"),
-    timezone: Optional[str] = Query(None)
+    timezone: Optional[str] = Query(None),
+    days: int = Query(1, ge=1, le=MAX_TIDE_DAYS),
+    interval: Optional[int] = Query(None, ge=1, le=360)
 ):
-    """Get tide tendency based on moon phase."""
-    if date_str:
-        try:
-            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            target_date = date.today()
-    else:
-        target_date = date.today()
-
-    if not timezone:
-        timezone = get_timezone_from_coords(lat, lng)
-
-    lunar = calculate_lunar(lat, lng, target_date, timezone)
-    return calculate_tides(lunar["illumination"])
+    """Get tide tendency, plus predicted high/low waters when a harmonic station is nearby."""
+    target_date = parse_date(date_str)
+    etag = make_etag("tides", lat, lng, target_date, timezone, days, interval)
+    not_modified = conditional(request, response, etag, astronomy_cache_control(is_pinned(date_str, target_date)))
+    if not_modified:
+        return not_modified
+
+    timezone = await resolve_timezone(lat, lng, timezone)
+    lunar, prediction = await asyncio.gather(
+        run_in_pool(calculate_lunar, lat, lng, target_date, timezone),
+        run_in_pool(predict_tides, lat, lng, target_date, timezone, days, interval)
+    )
+    tides = calculate_tides(lunar["illumination"])
+    tides["prediction"] = prediction
+    return typed_response(TidesResponse, tides, response)
 
 
-@app.get("/api/v1/weather")
+@app.get("/api/v1/almanac", response_model=AlmanacResponse)
+async def get_almanac(
+    request: Request,
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    start: Optional[str] = Query(None),
+    end: Optional[str] = Query(None),
+    timezone: Optional[str] = Query(None)
+):
+    """Get daily sun, twilight and moon events for a date range (default 30 days)."""
+    start_date = parse_date(start)
+    end_date = parse_date(end) if end else start_date + timedelta(days=29)
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end_date - start_date).days >= MAX_ALMANAC_DAYS:
+        raise HTTPException(status_code=400, detail=f"range is limited to {MAX_ALMANAC_DAYS} days")
+    etag = make_etag("almanac", lat, lng, start_date, end_date, timezone)
+    pinned = is_pinned(start, start_date) and (end is None or is_pinned(end, end_date))
+    not_modified = conditional(request, response, etag, astronomy_cache_control(pinned))
+    if not_modified:
+        return not_modified
+
+    timezone = await resolve_timezone(lat, lng, timezone)
+    days = await run_in_pool(calculate_almanac, lat, lng, start_date, end_date, timezone)
+    return typed_response(AlmanacResponse, {
+        "coordinates": {"lat": lat, "lng": lng},
+        "timezone": timezone,
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "days": days
+    }, response)
+
+
+@app.post("/api/v1/voyage", response_model=VoyageResponse)
+async def get_voyage(request: VoyageRequest):
+    """Get the sun, twilight, prayer and moon events seen along a planned route, in time order."""
+    track = VoyageTrack(
+        [(wp.lat, wp.lng, wp.speed or request.speed) for wp in request.waypoints],
+        request.departure
+    )
+    if track.days > MAX_VOYAGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"voyage is limited to {MAX_VOYAGE_DAYS} days")
+
+    events = await run_in_pool(calculate_voyage, track, request.events, request.prayer_method)
+    return typed_response(VoyageResponse, {
+        "departure": utc_isoformat(track.departure),
+        "arrival": utc_isoformat(track.arrival),
+        "distance_nm": round(track.distance_nm, 1),
+        "events": events
+    })
+
+
+@app.get("/api/v1/weather", response_model=WeatherData)
 async def get_weather(
+    request: Request,
+    response: Response,
     lat: float = Query(..., ge=-90, le=90),
-    lng: float = Query(..., ge=-180, le=180)
+    lng: float = Query(..., ge=-180, le=180),
+    date_str: Optional[str] = Query(None, alias="date"),
+    hour: Optional[int] = Query(None, ge=0, le=23),
+    timezone: Optional[str] = Query(None)
 ):
-    """Get marine weather data."""
-    return await fetch_marine_weather(lat, lng)
+    """Get marine weather data, current or forecast for a local date and hour."""
+    current = date_str is None and hour is None
+    target_date = parse_date(date_str)
+
+    if current:
+        weather = await fetch_marine_weather(lat, lng)
+        if weather is None:
+            raise HTTPException(status_code=503, detail="Current weather is unavailable for this location")
+    else:
+        forecast_task = asyncio.ensure_future(fetch_forecast(lat, lng))
+        try:
+            timezone = await resolve_timezone(lat, lng, timezone)
+            forecast = await forecast_task
+        finally:
+            forecast_task.cancel()
+        weather = weather_at(forecast, local_timestamp(target_date, FORECAST_HOUR if hour is None else hour, timezone))
+        if weather is None:
+            raise HTTPException(status_code=404, detail="No forecast available for that date and hour")
+
+    # Tagged by what is served, so a stale answer never passes for the fresh one
+    control = weather_cache_control(weather, weather_is_fresh(lat, lng, current, weather), current)
+    not_modified = conditional(request, response, weather_etag(weather), control)
+    if not_modified:
+        return not_modified
+    return typed_response(WeatherData, weather, response)
+
+
+@app.get("/api/v1/weather/forecast", response_model=WeatherForecastResponse)
+async def get_weather_forecast(
+    request: Request,
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    start: Optional[str] = Query(None),
+    hours: int = Query(24, ge=1, le=MAX_FORECAST_HOURS),
+    timezone: Optional[str] = Query(None)
+):
+    """Get hourly marine weather for a window (from local midnight of start, or from now)."""
+    forecast_task = asyncio.ensure_future(fetch_forecast(lat, lng))
+    try:
+        timezone = await resolve_timezone(lat, lng, timezone)
+        forecast = await forecast_task
+    finally:
+        forecast_task.cancel()
+
+    start_time = local_timestamp(parse_date(start), 0, timezone) if start else time.time() // 3600 * 3600
+    rows = forecast_hours(forecast, start_time, hours, timezone)
+    # A failed fetch gives no rows; don't let caches keep that
+    control = weather_cache_control(rows if forecast is not None else None, True, False)
+    not_modified = conditional(request, response, make_etag("weather_forecast", timezone, rows), control)
+    if not_modified:
+        return not_modified
+    return typed_response(WeatherForecastResponse, {
+        "coordinates": {"lat": lat, "lng": lng},
+        "timezone": timezone,
+        "hours": rows
+    }, response)
+
+
+@app.get("/api/v1/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss/eviction counters for the in-process caches."""
+    stats = all_cache_stats()
+    stats["timezone_index"] = timezone_index_stats()
+    stats["weather_provider"] = get_provider().stats()
+    stats["live"] = live_stats()
+    stats["profiling"] = profiling_stats()
+    stats["startup"] = startup_stats()
+    stats["single_flight"] = {
+        flight.name: flight.stats() for flight in (dashboard_flight, weather_flight)
+    }
+    return stats
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics: latency histograms per route and stage, upstream statuses, cache counters."""
+    flights = (dashboard_flight, weather_flight)
+    return PlainTextResponse(render_metrics({
+        "navapp_singleflight_calls_total": (
+            "counter", "Calls into each single-flight group.",
+            [(f'flight="{flight.name}"', flight.calls) for flight in flights]
+        ),
+        "navapp_singleflight_shared_total": (
+            "counter", "Calls that joined a computation already in flight.",
+            [(f'flight="{flight.name}"', flight.shared) for flight in flights]
+        ),
+    }), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
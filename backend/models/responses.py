@@ -0,0 +1,35 @@
+from typing import Any, Optional, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize in one native pass: pydantic-core for models, orjson for plain data."""
+    if isinstance(content, BaseModel) or orjson is None:
+        return to_json(content)
+    return orjson.dumps(content)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def typed_response(model: Type[BaseModel], content: dict, response: Optional[Response] = None) -> FastJSONResponse:
+    """Validate ``content`` into ``model`` and render it directly.
+
+    Returning a Response skips FastAPI's jsonable_encoder walk; headers
+    already set on the injected ``response`` (ETag, Cache-Control) are kept.
+    """
+    headers = None
+    if response is not None:
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return FastJSONResponse(model.model_validate(content), headers=headers)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import date, datetime
+from typing import List, Literal, Optional
+from datetime import datetime
 
 
 class Coordinates(BaseModel):
@@ -52,6 +52,36 @@ class TideData(BaseModel):
     moon_phase_factor: float
 
 
+class TideStation(BaseModel):
+    id: str
+    name: str
+    lat: float
+    lng: float
+    distance_km: float
+
+
+class TideExtreme(BaseModel):
+    time: str
+    type: Literal["high", "low"]
+    height_m: float
+
+
+class TideSeries(BaseModel):
+    start: str
+    interval_minutes: int
+    heights_m: List[float]
+
+
+class TidePrediction(BaseModel):
+    station: TideStation
+    extremes: List[TideExtreme]
+    series: Optional[TideSeries] = None
+
+
+class TidesResponse(TideData):
+    prediction: Optional[TidePrediction]
+
+
 class Wind(BaseModel):
     speed_knots: float
     direction: str
@@ -77,6 +107,36 @@ class WeatherData(BaseModel):
     temperature_c: float
 
 
+class WeatherForecastHour(WeatherData):
+    time: str
+
+
+class WeatherForecastResponse(BaseModel):
+    coordinates: Coordinates
+    timezone: str
+    hours: List[WeatherForecastHour]
+
+
+class AlmanacDay(BaseModel):
+    date: str
+    sunrise: str
+    sunset: str
+    day_length: str
+    twilight: Twilight
+    moonrise: Optional[str]
+    moonset: Optional[str]
+    moon_phase: str
+    moon_illumination: float
+
+
+class AlmanacResponse(BaseModel):
+    coordinates: Coordinates
+    timezone: str
+    start: str
+    end: str
+    days: List[AlmanacDay]
+
+
 class DashboardResponse(BaseModel):
     coordinates: Coordinates
     date: str
@@ -85,4 +145,58 @@ class DashboardResponse(BaseModel):
     prayer: PrayerData
     lunar: LunarData
     tides: TideData
-    weather: WeatherData
+    weather: Optional[WeatherData]
+
+
+class BatchDashboardItem(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    date: Optional[str] = None
+    timezone: Optional[str] = None
+    prayer_method: str = "muslim_world_league"
+
+
+class BatchDashboardRequest(BaseModel):
+    items: List[BatchDashboardItem] = Field(..., min_length=1, max_length=1000)
+    mode: Literal["fast", "precise"] = "fast"
+
+
+class BatchDashboardResponse(BaseModel):
+    results: List[DashboardResponse]
+
+
+class LiveFix(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+
+
+class VoyageWaypoint(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    # Knots on the leg leaving this waypoint; the request's speed if unset
+    speed: Optional[float] = Field(None, gt=0, le=60)
+
+
+class VoyageRequest(BaseModel):
+    waypoints: List[VoyageWaypoint] = Field(..., min_length=2, max_length=10000)
+    departure: datetime
+    speed: float = Field(6.0, gt=0, le=60)
+    prayer_method: str = "muslim_world_league"
+    events: List[Literal["sun", "twilight", "prayer", "moon"]] = ["sun", "twilight", "prayer", "moon"]
+
+
+class VoyageEvent(BaseModel):
+    time: str
+    local_time: str
+    timezone: str
+    event: str
+    kind: str
+    lat: float
+    lng: float
+
+
+class VoyageResponse(BaseModel):
+    departure: str
+    arrival: str
+    distance_nm: float
+    events: List[VoyageEvent]
@@ -0,0 +1,28 @@
+"""Build the memory-mapped timezone cell index used by services/timezones.py.
+
+Classifies every h3 shortcut cell of timezonefinder's data as lying inside
+a single zone or on a border, and writes the result so workers can map it
+at startup instead of classifying cells themselves. Rebuild after
+upgrading timezonefinder. Run from the backend directory:
+
+    python scripts/build_timezone_index.py [output path]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.timezones import CELL_INDEX_PATH, build_cell_index  # noqa: E402
+
+
+def main() -> None:
+    path = sys.argv[1] if len(sys.argv) > 1 else CELL_INDEX_PATH
+    started = time.perf_counter()
+    cells = build_cell_index(path)
+    print(f"wrote {cells} cells to {os.path.normpath(path)} "
+          f"({os.path.getsize(path) / 1024:.0f} KiB, {time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Generate the packed lunation table used by services/lunations.py.
+
+Writes every new moon, first quarter, full moon and last quarter instant
+between START_YEAR and END_YEAR as little-endian int64 Unix seconds after a
+small versioned header. Run from the backend directory:
+
+    python scripts/generate_lunations.py
+"""
+import calendar
+import os
+import struct
+import sys
+
+import ephem
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.lunations import HEADER, MAGIC, VERSION, NEW_MOON, TABLE_PATH  # noqa: E402
+
+START_YEAR = 1900
+END_YEAR = 2100
+
+# The serverless handler ships its own copy next to dashboard.py
+OUTPUTS = [
+    TABLE_PATH,
+    os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "api", "v1", "lunations.bin"),
+]
+
+
+def to_epoch(d: ephem.Date) -> int:
+    return calendar.timegm(d.datetime().timetuple())
+
+
+def main() -> None:
+    end = ephem.Date(f"{END_YEAR + 1}/1/1")
+    # Start from the last new moon before the range so every date has a previous new moon
+    new_moon = ephem.previous_new_moon(ephem.Date(f"{START_YEAR}/1/1"))
+    instants = []
+    while new_moon < end:
+        instants.append(to_epoch(new_moon))
+        instants.append(to_epoch(ephem.next_first_quarter_moon(new_moon)))
+        instants.append(to_epoch(ephem.next_full_moon(new_moon)))
+        instants.append(to_epoch(ephem.next_last_quarter_moon(new_moon)))
+        new_moon = ephem.next_new_moon(ephem.Date(new_moon + 1))
+    instants.append(to_epoch(new_moon))
+
+    data = HEADER.pack(MAGIC, VERSION, NEW_MOON, len(instants)) + struct.pack(f"<{len(instants)}q", *instants)
+    for path in OUTPUTS:
+        with open(path, "wb") as f:
+            f.write(data)
+        print(f"wrote {len(instants)} instants to {os.path.normpath(path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Generate a synthetic gridded forecast for running the "grid" weather provider offline.
+
+Writes smooth, plausible fields (moving pressure-like wave patterns, a
+diurnal temperature cycle, land masked out of the marine variables) on a
+regular grid starting at the current hour, first as a bulk .npz like a
+real download would be, then ingested into the memory-mapped grid file.
+Run from the backend directory:
+
+    python scripts/generate_weather_fixture.py [--step 2.0] [--hours 48] [--bbox S W N E]
+    WEATHER_PROVIDER=grid uvicorn main:app
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.weather_grid import GRID_PATH, ingest_npz  # noqa: E402
+
+
+def synthetic_fields(lats: np.ndarray, lngs: np.ndarray, times: np.ndarray) -> dict:
+    lat = np.radians(lats)[:, None, None]
+    lng = np.radians(lngs)[None, :, None]
+    hours = ((times - times[0]) / 3600.0)[None, None, :]
+    phase = 3 * lng + 2 * lat - 2 * np.pi * hours / 48
+
+    wind = 7 + 5 * np.sin(phase) * np.cos(lat)
+    fields = {
+        "wind_speed_10m": wind,
+        "wind_gusts_10m": wind * 1.4,
+        "wind_direction_10m": np.degrees(phase) % 360,
+        "temperature_2m": 28 * np.cos(lat) - 5 + 3 * np.sin(2 * np.pi * hours / 24 + lng),
+        "visibility": 20000 - 8000 * np.clip(np.sin(phase + 1), 0, None),
+        "wave_height": 0.4 + 0.2 * wind * (1 + 0.3 * np.cos(phase)),
+        "wave_period": 4 + 0.6 * wind,
+        "wave_direction": (np.degrees(phase) + 10) % 360,
+        "swell_wave_height": 1.2 + 0.8 * np.sin(lat * 4 + lng),
+        "swell_wave_period": 10 + 3 * np.cos(lng * 2),
+        "swell_wave_direction": (np.degrees(lng * 2) + 240) % 360,
+    }
+    shape = (len(lats), len(lngs), len(times))
+    fields = {name: np.broadcast_to(value, shape).astype(np.float32) for name, value in fields.items()}
+
+    # Crude "land" patches so the marine variables exercise the NaN handling
+    land = np.broadcast_to((np.sin(lat * 7) * np.cos(lng * 5)) > 0.8, shape)
+    for name in ("wave_height", "wave_period", "wave_direction",
+                 "swell_wave_height", "swell_wave_period", "swell_wave_direction"):
+        fields[name][land] = np.nan
+    return fields
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--step", type=float, default=2.0, help="grid spacing in degrees")
+    parser.add_argument("--hours", type=int, default=48, help="forecast length in hours")
+    parser.add_argument("--bbox", type=float, nargs=4, metavar=("S", "W", "N", "E"),
+                        default=(-80.0, -180.0, 80.0, 180.0))
+    parser.add_argument("--output", default=GRID_PATH)
+    args = parser.parse_args()
+
+    south, west, north, east = args.bbox
+    lats = np.arange(south, north + args.step / 2, args.step)
+    # A global grid stops one step short of 180 and wraps
+    lngs = np.arange(west, east - args.step / 2 if east - west >= 360 else east + args.step / 2, args.step)
+    start = int(time.time() // 3600 * 3600) - 3600
+    times = start + 3600 * np.arange(args.hours, dtype=np.int64)
+
+    bulk = args.output + ".npz"
+    np.savez(bulk, lats=lats, lngs=lngs, times=times, **synthetic_fields(lats, lngs, times))
+    n_lat, n_lng, n_time, names = ingest_npz(bulk, args.output)
+    os.remove(bulk)
+    size = os.path.getsize(args.output)
+    print(f"wrote {n_lat}x{n_lng}x{n_time} grid of {len(names)} variables "
+          f"({size / 1e6:.1f} MB) to {os.path.normpath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
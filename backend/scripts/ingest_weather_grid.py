@@ -0,0 +1,27 @@
+"""Ingest a bulk gridded forecast into the memory-mapped file read by the "grid" weather provider.
+
+The input is an .npz with regular ascending ``lats``, ``lngs`` and
+``times`` (Unix seconds) axes plus one [lat, lng, time] array per Open-Meteo
+hourly variable name (wind_speed_10m in m/s, visibility in metres, ...).
+Run from the backend directory:
+
+    python scripts/ingest_weather_grid.py forecast.npz [output]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.weather_grid import GRID_PATH, ingest_npz  # noqa: E402
+
+
+def main() -> None:
+    if len(sys.argv) not in (2, 3):
+        sys.exit(__doc__)
+    output = sys.argv[2] if len(sys.argv) == 3 else GRID_PATH
+    n_lat, n_lng, n_time, names = ingest_npz(sys.argv[1], output)
+    print(f"wrote {n_lat}x{n_lng}x{n_time} grid of {', '.join(names)} to {os.path.normpath(output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+from datetime import date, datetime, timedelta
+import math
+import pytz
+
+from services.astronomy import ephem, format_time, moon_phase_name
+from services.metrics import timed
+
+
+# (name, altitude of the disc centre in degrees) for each solar band.
+# Sunrise/sunset use astral's refraction-corrected 0.833 degree horizon.
+SOLAR_BANDS = [
+    ("sun", -0.833),
+    ("civil", -6.0),
+    ("nautical", -12.0),
+    ("astronomical", -18.0),
+]
+
+# Mean rate of change of hour angle, radians per day
+SUN_RATE = 2 * math.pi
+MOON_RATE = 2 * math.pi / 1.0351
+
+# Atmospheric refraction at the horizon (ephem's default atmosphere)
+HORIZON_REFRACTION = math.radians(34 / 60)
+EARTH_RADIUS_AU = 6378.137 / 149597870.7
+
+MAX_ALMANAC_DAYS = 366
+
+
+def _wrap(angle: float) -> float:
+    """Wrap an angle to [-pi, pi)."""
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+def _sidereal(t: float, lng: float) -> float:
+    """Local mean sidereal time in radians for an ephem date."""
+    jd = t + 2415020.0
+    gmst = 280.46061837 + 360.98564736629 * (jd - 2451545.0)
+    return math.radians(gmst % 360) + lng
+
+
+class BodyTrack:
+    """Daily geocentric samples of a body, interpolated quadratically.
+
+    The ephem position is evaluated once per day; every rising/setting in
+    the range is then solved against the interpolated track, so each day's
+    samples are reused by the neighbouring days instead of restarting an
+    ephem search from scratch.
+    """
+
+    def __init__(self, body: "ephem.Body", t0: float, days: int):
+        self.t0 = t0
+        self.last = days - 2
+        self.ra, self.dec, self.horizon = [], [], []
+        for k in range(days):
+            body.compute(ephem.Date(t0 + k))
+            self.ra.append(body.g_ra)
+            self.dec.append(body.g_dec)
+            self.horizon.append(self._horizon(body))
+        # Unwrap RA so interpolation doesn't jump at 0h/24h
+        for k in range(1, days):
+            self.ra[k] = self.ra[k - 1] + _wrap(self.ra[k] - self.ra[k - 1])
+
+    def _horizon(self, body: "ephem.Body") -> float:
+        return 0.0
+
+    def at(self, t: float) -> tuple:
+        """Interpolated (ra, dec, horizon) at an ephem date."""
+        x = t - self.t0
+        k = min(max(int(x + 0.5), 1), self.last)
+        p = x - k
+        # Three-point Lagrange weights
+        w0, w1, w2 = p * (p - 1) / 2, 1 - p * p, p * (p + 1) / 2
+        ra, dec, horizon = self.ra, self.dec, self.horizon
+        return (
+            w0 * ra[k - 1] + w1 * ra[k] + w2 * ra[k + 1],
+            w0 * dec[k - 1] + w1 * dec[k] + w2 * dec[k + 1],
+            w0 * horizon[k - 1] + w1 * horizon[k] + w2 * horizon[k + 1],
+        )
+
+
+class MoonTrack(BodyTrack):
+    def _horizon(self, body: "ephem.Body") -> float:
+        # Geocentric altitude of the centre when the upper limb appears on
+        # the refracted horizon: parallax minus refraction and semidiameter.
+        parallax = math.asin(EARTH_RADIUS_AU / body.earth_distance)
+        return parallax - HORIZON_REFRACTION - body.radius
+
+
+def solve_transit(track: BodyTrack, t: float, lat: float, lng: float, rate: float) -> float:
+    """Solve for the upper transit nearest ``t`` (ephem date; lat/lng in radians)."""
+    for _ in range(3):
+        ra, _, _ = track.at(t)
+        t -= _wrap(_sidereal(t, lng) - ra) / rate
+    return t
+
+
+def solve_crossing(track: BodyTrack, t: float, lat: float, lng: float, rate: float,
+              direction: int, horizon: float = None):
+    """Solve for the rising (direction -1) or setting (+1) nearest ``t``."""
+    sin_lat, cos_lat = math.sin(lat), math.cos(lat)
+    for _ in range(6):
+        ra, dec, body_horizon = track.at(t)
+        h0 = body_horizon if horizon is None else horizon
+        cos_h0 = (math.sin(h0) - sin_lat * math.sin(dec)) / (cos_lat * math.cos(dec))
+        if not -1 <= cos_h0 <= 1:
+            return None
+        step = _wrap(direction * math.acos(cos_h0) - _wrap(_sidereal(t, lng) - ra)) / rate
+        t += step
+        # Output is to the minute, so a couple of seconds is converged
+        if abs(step) < 2 / 86400:
+            return t
+    return t
+
+
+def _to_utc(t: float) -> datetime:
+    return pytz.UTC.localize(ephem.Date(t).datetime())
+
+
+def _day_length(sunrise: float, sunset: float) -> str:
+    seconds = (sunset - sunrise) * 86400
+    return f"{int(seconds // 3600)}h {int((seconds % 3600) // 60):02d}m"
+
+
+@timed("almanac")
+def calculate_almanac(lat: float, lng: float, start_date: date, end_date: date, timezone: str) -> list:
+    """Calculate daily solar, twilight and lunar events for a date range.
+
+    The sun and moon are each evaluated with ephem once per day and every
+    event is found by iterating the hour-angle equation on a quadratic
+    interpolation of those samples. Times agree with the per-date
+    endpoints to within about a minute.
+    """
+    tz = pytz.timezone(timezone)
+    phi = math.radians(lat)
+    lam = math.radians(lng)
+
+    def local(day: date, hour: int = 0) -> float:
+        dt = tz.localize(datetime.combine(day, datetime.min.time().replace(hour=hour)))
+        return float(ephem.Date(dt.astimezone(pytz.UTC).replace(tzinfo=None)))
+
+    def fmt(t) -> str:
+        return format_time(_to_utc(t), timezone) if t is not None else "N/A"
+
+    # Daily samples from two days before the range to two days after it
+    n_days = (end_date - start_date).days + 1
+    t0 = local(start_date, 12) - 2
+    sun_track = BodyTrack(ephem.Sun(), t0, n_days + 5)
+    moon_track = MoonTrack(ephem.Moon(), t0, n_days + 5)
+    moon = ephem.Moon()
+    moon_period = 2 * math.pi / MOON_RATE
+
+    days = []
+    for offset in range(n_days):
+        day = start_date + timedelta(days=offset)
+        noon = local(day, 12)
+        day_start, day_end = local(day), local(day + timedelta(days=1))
+
+        transit = solve_transit(sun_track, noon, phi, lam, SUN_RATE)
+        bands = {}
+        for name, horizon in SOLAR_BANDS:
+            h0 = math.radians(horizon)
+            bands[name] = (
+                solve_crossing(sun_track, transit, phi, lam, SUN_RATE, -1, h0),
+                solve_crossing(sun_track, transit, phi, lam, SUN_RATE, 1, h0),
+            )
+
+        sunrise, sunset = bands["sun"]
+        if sunrise is not None and sunset is not None:
+            day_length = _day_length(sunrise, sunset)
+            sunrise_str, sunset_str = fmt(sunrise), fmt(sunset)
+        else:
+            _, dec, _ = sun_track.at(transit)
+            day_length = "24h 00m" if abs(phi - dec) < math.pi / 2 else "0h 00m"
+            # Same sentinel as calculate_solar for polar day or night
+            sunrise_str = sunset_str = "Polar"
+
+        # Moonrise/moonset that fall inside the local day, from the transits around it
+        moon_transit = solve_transit(moon_track, noon, phi, lam, MOON_RATE)
+        moonrise = moonset = None
+        for t in (moon_transit - moon_period, moon_transit, moon_transit + moon_period):
+            # A rising precedes its transit and a setting follows it by at most half a period
+            if moonrise is None and day_start <= t < day_end + moon_period / 2:
+                rise = solve_crossing(moon_track, t, phi, lam, MOON_RATE, -1)
+                if rise is not None and day_start <= rise < day_end:
+                    moonrise = rise
+            if moonset is None and day_start - moon_period / 2 <= t < day_end:
+                set_ = solve_crossing(moon_track, t, phi, lam, MOON_RATE, 1)
+                if set_ is not None and day_start <= set_ < day_end:
+                    moonset = set_
+
+        # Moon illumination at local noon
+        moon.compute(ephem.Date(noon))
+
+        days.append({
+            "date": day.isoformat(),
+            "sunrise": sunrise_str,
+            "sunset": sunset_str,
+            "day_length": day_length,
+            "twilight": {
+                band: {"dawn": fmt(bands[band][0]), "dusk": fmt(bands[band][1])}
+                for band in ("civil", "nautical", "astronomical")
+            },
+            "moonrise": fmt(moonrise) if moonrise is not None else None,
+            "moonset": fmt(moonset) if moonset is not None else None,
+            "moon_phase": moon_phase_name(day),
+            "moon_illumination": round(moon.phase / 100.0, 2),
+        })
+    return days
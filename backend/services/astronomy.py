@@ -1,19 +1,30 @@
 from datetime import date, datetime, timedelta
-from astral import LocationInfo
-from astral.sun import sun
-import ephem
 import math
-from timezonefinder import TimezoneFinder
 import pytz
 
+from services.prayer_times import (
+    calculate_prayer_times,
+    calculate_prayer_times_array,
+    format_times_array,
+    timezone_offsets
+)
+from services.timezones import timezone_at
+from services.cache import TTLCache, MISSING, env_int
+from services.metrics import timed
+from services.lazy import lazy_import
+from services.lunations import FULL_MOON, NEW_MOON, lunation_fraction, next_phase_date, to_epoch
 
-tf = TimezoneFinder()
 
+# Imported on first use so they stay off the cold-start path
+astral = lazy_import("astral")
+astral_sun = lazy_import("astral.sun")
+ephem = lazy_import("ephem")
 
+
+@timed("timezone")
 def get_timezone_from_coords(lat: float, lng: float) -> str:
     """Get timezone string from coordinates."""
-    tz = tf.timezone_at(lat=lat, lng=lng)
-    return tz if tz else "UTC"
+    return timezone_at(lat, lng)
 
 
 def format_time(dt: datetime, tz_str: str) -> str:
@@ -27,13 +38,14 @@ def format_time(dt: datetime, tz_str: str) -> str:
     return local_dt.strftime("%H:%M")
 
 
+@timed("solar")
 def calculate_solar(lat: float, lng: float, target_date: date, timezone: str) -> dict:
     """Calculate sunrise, sunset, twilight times."""
-    location = LocationInfo(latitude=lat, longitude=lng, timezone=timezone)
+    location = astral.LocationInfo(latitude=lat, longitude=lng, timezone=timezone)
     tz = pytz.timezone(timezone)
 
     try:
-        s = sun(location.observer, date=target_date, tzinfo=tz)
+        s = astral_sun.sun(location.observer, date=target_date, tzinfo=tz)
     except ValueError:
         # Polar day or night - sun doesn't rise or set
         return {
@@ -96,56 +108,175 @@ def calculate_solar(lat: float, lng: float, target_date: date, timezone: str) ->
     }
 
 
-def calculate_lunar(lat: float, lng: float, target_date: date, timezone: str) -> dict:
-    """Calculate moon phase, moonrise/moonset, and upcoming events."""
-    obs = ephem.Observer()
-    obs.lat = str(lat)
-    obs.lon = str(lng)
-    obs.elevation = 0
-    obs.date = datetime.combine(target_date, datetime.min.time().replace(hour=12))
+def solar_declination_eot(jd: float) -> tuple:
+    """Solar declination (degrees) and equation of time (hours) for a Julian date."""
+    D = jd - 2451545.0
+    g = (357.529 + 0.98560028 * D) % 360
+    q = (280.459 + 0.98564736 * D) % 360
+    L = (q + 1.915 * math.sin(math.radians(g)) + 0.020 * math.sin(math.radians(2 * g))) % 360
+    e = 23.439 - 0.00000036 * D
+    decl = math.degrees(math.asin(math.sin(math.radians(e)) * math.sin(math.radians(L))))
+    RA = math.degrees(math.atan2(math.cos(math.radians(e)) * math.sin(math.radians(L)), math.cos(math.radians(L)))) / 15
+    eqt = (q / 15 - RA % 24 + 12) % 24 - 12
+    return decl, eqt
 
-    moon = ephem.Moon()
-    moon.compute(obs)
 
-    # Moon illumination
-    illumination = moon.phase / 100.0
+def _julian_date(dt: datetime) -> float:
+    return dt.timestamp() / 86400.0 + 2440587.5
 
-    # Determine moon phase name
-    phase_angle = moon.phase
-    if phase_angle < 1:
-        phase_name = "New Moon"
-    elif phase_angle < 25:
-        phase_name = "Waxing Crescent"
-    elif phase_angle < 50:
-        phase_name = "First Quarter"
-    elif phase_angle < 75:
-        phase_name = "Waxing Gibbous"
-    elif phase_angle < 99:
-        phase_name = "Full Moon" if phase_angle > 95 else "Waxing Gibbous"
-    else:
-        phase_name = "Full Moon"
 
-    # More accurate phase determination using moon age
-    moon_age_days = (target_date - date(2000, 1, 6)).days % 29.530588853
+@timed("solar")
+def calculate_solar_fast(lat: float, lng: float, target_date: date, timezone: str, refine: bool = True) -> dict:
+    """Calculate sunrise, sunset, noon and twilight from one solar position evaluation.
+
+    Declination and equation of time are evaluated once at local noon and
+    every event follows from the hour-angle formula for its depression;
+    with ``refine`` each event is corrected once using the solar position at
+    its own instant.
+
+    Error bounds (refined, |lat| <= 60): sunrise, sunset and noon within
+    1 minute of calculate_solar (2 minutes up to 66 degrees); twilight within
+    1 minute of a geometric ephem search. calculate_solar's twilight applies
+    ephem's atmospheric refraction below the horizon, which shifts civil
+    twilight by up to 5 minutes. Without refinement twilight can be off by
+    up to ~15 minutes. Unlike astral, sunrise/sunset are still given when a
+    twilight band never ends (white nights).
+    """
+    tz = pytz.timezone(timezone)
+    local_noon = tz.localize(datetime.combine(target_date, datetime.min.time().replace(hour=12))).astimezone(pytz.UTC)
+    decl, eqt = solar_declination_eot(_julian_date(local_noon))
+
+    # Transit closest to local noon
+    utc_day = datetime.combine(local_noon.date(), datetime.min.time()).replace(tzinfo=pytz.UTC)
+    transit = utc_day + timedelta(hours=12 - lng / 15 - eqt)
+    if transit - local_noon > timedelta(hours=12):
+        transit -= timedelta(days=1)
+    elif local_noon - transit > timedelta(hours=12):
+        transit += timedelta(days=1)
+
+    sin_lat, cos_lat = math.sin(math.radians(lat)), math.cos(math.radians(lat))
+
+    def cos_hour_angle(depression: float, dec: float) -> float:
+        return (math.sin(math.radians(-depression)) - sin_lat * math.sin(math.radians(dec))) / \
+               (cos_lat * math.cos(math.radians(dec)))
+
+    def event(depression: float, direction: int):
+        cos_t = cos_hour_angle(depression, decl)
+        if not -1 <= cos_t <= 1:
+            return None
+        t = transit + timedelta(hours=direction * math.degrees(math.acos(cos_t)) / 15)
+        if refine:
+            dec2, eqt2 = solar_declination_eot(_julian_date(t))
+            cos_t = cos_hour_angle(depression, dec2)
+            if not -1 <= cos_t <= 1:
+                return None
+            t = transit + timedelta(hours=(eqt - eqt2) + direction * math.degrees(math.acos(cos_t)) / 15)
+        return t
+
+    sunrise, sunset = event(0.833, -1), event(0.833, 1)
+    if sunrise is None or sunset is None:
+        # Polar day if the sun is up at transit, polar night otherwise
+        polar_day = cos_hour_angle(0.833, decl) < -1
+        return {
+            "sunrise": "Polar",
+            "sunset": "Polar",
+            "solar_noon": "N/A",
+            "day_length": "24h 00m" if polar_day else "0h 00m",
+            "twilight": {
+                "civil": {"dawn": "N/A", "dusk": "N/A"},
+                "nautical": {"dawn": "N/A", "dusk": "N/A"},
+                "astronomical": {"dawn": "N/A", "dusk": "N/A"}
+            }
+        }
+
+    day_length = sunset - sunrise
+    hours = int(day_length.total_seconds() // 3600)
+    minutes = int((day_length.total_seconds() % 3600) // 60)
+
+    def twilight(depression: float) -> dict:
+        return {
+            "dawn": format_time(event(depression, -1), timezone),
+            "dusk": format_time(event(depression, 1), timezone)
+        }
+
+    return {
+        "sunrise": format_time(sunrise, timezone),
+        "sunset": format_time(sunset, timezone),
+        "solar_noon": format_time(transit, timezone),
+        "day_length": f"{hours}h {minutes:02d}m",
+        "twilight": {
+            "civil": twilight(6),
+            "nautical": twilight(12),
+            "astronomical": twilight(18)
+        }
+    }
+
+
+def moon_phase_name(target_date: date) -> str:
+    """Name the moon phase for a date from the moon age at noon UTC."""
+    fraction = lunation_fraction(to_epoch(target_date, 12))
+    if fraction is not None:
+        moon_age_days = fraction * 29.530588853
+    else:
+        # Outside the lunation table: fall back to the mean moon age
+        moon_age_days = (target_date - date(2000, 1, 6)).days % 29.530588853
     if moon_age_days < 1.85:
-        phase_name = "New Moon"
+        return "New Moon"
     elif moon_age_days < 7.38:
-        phase_name = "Waxing Crescent"
+        return "Waxing Crescent"
     elif moon_age_days < 9.23:
-        phase_name = "First Quarter"
+        return "First Quarter"
     elif moon_age_days < 14.77:
-        phase_name = "Waxing Gibbous"
+        return "Waxing Gibbous"
     elif moon_age_days < 16.61:
-        phase_name = "Full Moon"
+        return "Full Moon"
     elif moon_age_days < 22.15:
-        phase_name = "Waning Gibbous"
+        return "Waning Gibbous"
     elif moon_age_days < 23.99:
-        phase_name = "Last Quarter"
+        return "Last Quarter"
     else:
-        phase_name = "Waning Crescent"
+        return "Waning Crescent"
+
+
+lunar_cache = TTLCache("lunar_global", max_entries=env_int("LUNAR_CACHE_MAX_ENTRIES", 4096), ttl=30 * 24 * 3600)
+
 
-    # Moonrise and moonset
+@timed("lunar_global")
+def calculate_lunar_global(target_date: date) -> dict:
+    """Calculate the location-independent lunar data for a date (cached per date)."""
+    cached = lunar_cache.get(target_date)
+    if cached is not MISSING:
+        return cached
+
+    # Geocentric illumination at noon UTC
+    moon = ephem.Moon(datetime.combine(target_date, datetime.min.time().replace(hour=12)))
+    illumination = moon.phase / 100.0
+
+    # Next full moon and new moon, from the lunation table where it covers the date
+    midnight = datetime.combine(target_date, datetime.min.time())
+    next_full = next_phase_date(target_date, FULL_MOON) or ephem.next_full_moon(midnight).datetime().date()
+    next_new = next_phase_date(target_date, NEW_MOON) or ephem.next_new_moon(midnight).datetime().date()
+
+    result = {
+        "phase": moon_phase_name(target_date),
+        "illumination": round(illumination, 2),
+        "next_full_moon": next_full.isoformat(),
+        "next_new_moon": next_new.isoformat()
+    }
+    lunar_cache.set(target_date, result)
+    return result
+
+
+@timed("lunar_local")
+def calculate_lunar_local(lat: float, lng: float, target_date: date, timezone: str) -> dict:
+    """Calculate the observer-dependent lunar data: moonrise and moonset."""
+    obs = ephem.Observer()
+    obs.lat = str(lat)
+    obs.lon = str(lng)
+    obs.elevation = 0
     obs.date = datetime.combine(target_date, datetime.min.time())
+    moon = ephem.Moon()
+
     try:
         moonrise = obs.next_rising(moon).datetime()
         moonrise_str = format_time(moonrise, timezone)
@@ -158,18 +289,20 @@ def calculate_lunar(lat: float, lng: float, target_date: date, timezone: str) ->
     except (ephem.AlwaysUpError, ephem.NeverUpError):
         moonset_str = None
 
-    # Next full moon and new moon
-    obs.date = datetime.combine(target_date, datetime.min.time())
-    next_full = ephem.next_full_moon(obs.date).datetime().date()
-    next_new = ephem.next_new_moon(obs.date).datetime().date()
+    return {"moonrise": moonrise_str, "moonset": moonset_str}
 
+
+def calculate_lunar(lat: float, lng: float, target_date: date, timezone: str) -> dict:
+    """Calculate moon phase, moonrise/moonset, and upcoming events."""
+    lunar = calculate_lunar_global(target_date)
+    local = calculate_lunar_local(lat, lng, target_date, timezone)
     return {
-        "phase": phase_name,
-        "illumination": round(illumination, 2),
-        "moonrise": moonrise_str,
-        "moonset": moonset_str,
-        "next_full_moon": next_full.isoformat(),
-        "next_new_moon": next_new.isoformat()
+        "phase": lunar["phase"],
+        "illumination": lunar["illumination"],
+        "moonrise": local["moonrise"],
+        "moonset": local["moonset"],
+        "next_full_moon": lunar["next_full_moon"],
+        "next_new_moon": lunar["next_new_moon"]
     }
 
 
@@ -193,3 +326,49 @@ def calculate_tides(illumination: float) -> dict:
             "description": "Transitional period between spring and neap tides",
             "moon_phase_factor": illumination
         }
+
+
+SOLAR_MODES = {"precise": calculate_solar, "fast": calculate_solar_fast}
+
+
+def calculate_astronomy(lat: float, lng: float, target_date: date, timezone: str,
+                        prayer_method: str = "muslim_world_league", mode: str = "precise") -> dict:
+    """Calculate the solar, prayer, lunar and tide sections of the dashboard."""
+    lunar = calculate_lunar(lat, lng, target_date, timezone)
+    return {
+        "solar": SOLAR_MODES[mode](lat, lng, target_date, timezone),
+        "prayer": calculate_prayer_times(lat, lng, target_date, timezone, prayer_method),
+        "lunar": lunar,
+        "tides": calculate_tides(lunar["illumination"]),
+    }
+
+
+def calculate_astronomy_batch(keys: list, mode: str = "fast") -> list:
+    """Calculate astronomy for a list of (lat, lng, date, timezone, method) tuples.
+
+    Prayer times come from the vectorized engine, one pass per method, and
+    solar times default to the single-pass fast mode.
+    """
+    solar = SOLAR_MODES[mode]
+    results = []
+    for lat, lng, target_date, timezone, _ in keys:
+        lunar = calculate_lunar(lat, lng, target_date, timezone)
+        results.append({
+            "solar": solar(lat, lng, target_date, timezone),
+            "prayer": None,
+            "lunar": lunar,
+            "tides": calculate_tides(lunar["illumination"]),
+        })
+
+    by_method = {}
+    for idx, key in enumerate(keys):
+        by_method.setdefault(key[4], []).append(idx)
+    for method, indices in by_method.items():
+        lats, lngs, dates, timezones, _ = zip(*(keys[i] for i in indices))
+        times = calculate_prayer_times_array(lats, lngs, dates, timezone_offsets(dates, timezones), method)
+        columns = {name: format_times_array(values) for name, values in times.items() if name != "method"}
+        for row, idx in enumerate(indices):
+            prayer = {name: column[row] for name, column in columns.items()}
+            prayer["method"] = times["method"]
+            results[idx]["prayer"] = prayer
+    return results
@@ -0,0 +1,46 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from services.cache import env_int
+from services.profiling import wrap_call
+
+
+# "thread" keeps caches shared with the event loop process; "process"
+# sidesteps the GIL for heavy ephem searches at the cost of pickling.
+ASTRONOMY_EXECUTOR = os.environ.get("ASTRONOMY_EXECUTOR", "thread").lower()
+ASTRONOMY_WORKERS = env_int("ASTRONOMY_WORKERS", min(8, (os.cpu_count() or 1) + 2))
+
+_executor: Optional[Executor] = None
+
+
+def start_executor() -> Executor:
+    """Create the bounded worker pool for CPU-bound astronomy work."""
+    global _executor
+    if _executor is None:
+        if ASTRONOMY_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=ASTRONOMY_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=ASTRONOMY_WORKERS, thread_name_prefix="astronomy")
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_in_pool(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking function in the worker pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    call = partial(fn, *args, **kwargs)
+    if ASTRONOMY_EXECUTOR != "process":
+        # Carry the request context over so stage timings reach its Server-Timing
+        # header, and the worker joins the request's profile if it has one
+        call = partial(contextvars.copy_context().run, wrap_call(call))
+    return await loop.run_in_executor(start_executor(), call)
@@ -0,0 +1,190 @@
+import asyncio
+import time
+from datetime import date, datetime, timezone as dt_timezone
+from typing import Optional
+
+import numpy as np
+import pytz
+
+from services.cache import TTLCache, MISSING, env_int
+from services.singleflight import SingleFlight
+from services.weather_client import (
+    FORECAST_SLOT_S,
+    MARINE_URL,
+    FORECAST_URL,
+    MARINE_TIMEOUT,
+    FORECAST_TIMEOUT,
+    _get_json,
+    get_client,
+    snap_to_grid,
+    build_weather
+)
+
+
+# Hourly variables requested from each API, stored as one column each
+HOURLY_MARINE = (
+    "wave_height", "wave_period", "wave_direction",
+    "swell_wave_height", "swell_wave_period", "swell_wave_direction"
+)
+HOURLY_WEATHER = (
+    "temperature_2m", "visibility", "wind_speed_10m", "wind_direction_10m", "wind_gusts_10m"
+)
+DIRECTIONS = {"wave_direction", "swell_wave_direction", "wind_direction_10m"}
+
+WEATHER_FORECAST_DAYS = env_int("WEATHER_FORECAST_DAYS", 7)
+MAX_FORECAST_HOURS = 24 * 7
+
+forecast_cache = TTLCache(
+    "weather_forecast",
+    max_entries=env_int("WEATHER_FORECAST_MAX_ENTRIES", 1024),
+    ttl=FORECAST_SLOT_S,
+    max_bytes=env_int("WEATHER_FORECAST_MAX_BYTES", 32 * 1024 * 1024),
+)
+forecast_flight = SingleFlight("weather_forecast")
+
+
+def _column(document: dict, name: str, axis: np.ndarray) -> np.ndarray:
+    """One hourly variable resampled onto ``axis``, NaN where the document has no value."""
+    hourly = document.get("hourly", {})
+    values = np.array([np.nan if v is None else v for v in hourly.get(name, [])], dtype=np.float32)
+    times = np.asarray(hourly.get("time", []), dtype=np.int64)
+    if len(values) != len(times) or not len(times):
+        return np.full(len(axis), np.nan, dtype=np.float32)
+    if np.array_equal(times, axis):
+        return values
+    idx = np.searchsorted(times, axis)
+    inside = (idx < len(times)) & (times[np.minimum(idx, len(times) - 1)] == axis)
+    column = np.full(len(axis), np.nan, dtype=np.float32)
+    column[inside] = values[idx[inside]]
+    return column
+
+
+class HourlyForecast:
+    """One grid cell's hourly forecast: float32 columns sharing a Unix-time axis."""
+
+    __slots__ = ("times", "columns")
+
+    def __init__(self, times: np.ndarray, columns: dict):
+        self.times = times
+        self.columns = columns
+
+    @classmethod
+    def from_documents(cls, marine_data: dict, weather_data: dict) -> Optional["HourlyForecast"]:
+        """Build from Open-Meteo hourly documents; None if the forecast call failed."""
+        times = np.asarray(weather_data.get("hourly", {}).get("time", []), dtype=np.int64)
+        if not len(times):
+            return None
+        columns = {name: _column(weather_data, name, times) for name in HOURLY_WEATHER}
+        columns.update((name, _column(marine_data, name, times)) for name in HOURLY_MARINE)
+        return cls(times, columns)
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self.times.nbytes + sum(c.nbytes for c in self.columns.values())
+
+    def covers(self, t: float) -> bool:
+        return bool(self.times[0] <= t <= self.times[-1])
+
+    def at(self, t: float) -> Optional[dict]:
+        """Variables linearly interpolated to Unix time ``t``; None outside the forecast."""
+        if not self.covers(t):
+            return None
+        i = min(int(np.searchsorted(self.times, t, side="right")) - 1, len(self.times) - 1)
+        j = min(i + 1, len(self.times) - 1)
+        t0, t1 = self.times[i], self.times[j]
+        w = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+        values = {}
+        for name, column in self.columns.items():
+            a, b = float(column[i]), float(column[j])
+            if name in DIRECTIONS:
+                # Interpolate the short way round the compass
+                value = (a + w * (((b - a + 180) % 360) - 180)) % 360
+            else:
+                value = a + w * (b - a)
+            if value == value:
+                values[name] = value
+        return values
+
+    def window(self, start: float, end: float) -> tuple:
+        """Time axis and column slices for hours in [start, end)."""
+        lo, hi = np.searchsorted(self.times, [start, end])
+        return self.times[lo:hi], {name: column[lo:hi] for name, column in self.columns.items()}
+
+
+def shape_weather(values: Optional[dict]) -> dict:
+    """API weather section from one row of forecast values (defaults when missing)."""
+    values = values or {}
+    marine = {name: values[name] for name in HOURLY_MARINE if name in values}
+    weather = {name: values[name] for name in HOURLY_WEATHER if name in values}
+    return build_weather({"current": marine}, {"current": weather})
+
+
+def forecast_cache_key(lat: float, lng: float) -> tuple:
+    return (*snap_to_grid(lat, lng), int(time.time() // FORECAST_SLOT_S))
+
+
+def cached_open_meteo_forecast(lat: float, lng: float) -> Optional[HourlyForecast]:
+    """The cell's forecast for this hour if it is already cached; nothing is fetched or counted."""
+    cached = forecast_cache.peek(forecast_cache_key(lat, lng))
+    return None if cached is MISSING else cached
+
+
+async def fetch_open_meteo_forecast(lat: float, lng: float) -> Optional[HourlyForecast]:
+    """Hourly forecast for the grid cell containing (lat, lng), fetched once per cell and hour."""
+    key = forecast_cache_key(lat, lng)
+    cached = forecast_cache.get(key)
+    if cached is not MISSING:
+        return cached
+    return await forecast_flight.do(key, _fetch_and_cache, key)
+
+
+async def _fetch_and_cache(key: tuple) -> Optional[HourlyForecast]:
+    cell_lat, cell_lng, slot = key
+    common = {
+        "latitude": cell_lat,
+        "longitude": cell_lng,
+        "timeformat": "unixtime",
+        "past_days": 1,
+        "forecast_days": WEATHER_FORECAST_DAYS,
+    }
+    client = await get_client()
+    marine_data, weather_data = await asyncio.gather(
+        _get_json(client, MARINE_URL, {**common, "hourly": ",".join(HOURLY_MARINE)}, MARINE_TIMEOUT),
+        _get_json(client, FORECAST_URL, {**common, "hourly": ",".join(HOURLY_WEATHER), "wind_speed_unit": "ms"},
+                  FORECAST_TIMEOUT),
+    )
+    forecast = HourlyForecast.from_documents(marine_data, weather_data)
+    if forecast is not None:
+        forecast_cache.set(key, forecast, ttl=max(1.0, (slot + 1) * FORECAST_SLOT_S - time.time()))
+    return forecast
+
+
+def local_timestamp(target_date: date, hour: int, timezone: str) -> float:
+    """Unix time of ``hour`` o'clock on ``target_date`` in ``timezone``."""
+    tz = pytz.timezone(timezone)
+    return tz.localize(datetime.combine(target_date, datetime.min.time().replace(hour=hour))).timestamp()
+
+
+def weather_at(forecast: Optional[HourlyForecast], t: float) -> Optional[dict]:
+    """Weather section for Unix time ``t`` from a cell's hourly forecast.
+
+    None when there is no forecast, ``t`` is outside it or every variable
+    is missing there, rather than made-up calm conditions.
+    """
+    values = forecast.at(t) if forecast is not None else None
+    return shape_weather(values) if values else None
+
+
+def forecast_hours(forecast: Optional[HourlyForecast], start: float, hours: int, timezone: str) -> list:
+    """Hourly weather rows for a window, with local ISO timestamps."""
+    if forecast is None:
+        return []
+    tz = pytz.timezone(timezone)
+    times, columns = forecast.window(start, start + hours * 3600)
+    rows = []
+    for i, t in enumerate(times.tolist()):
+        values = {name: float(column[i]) for name, column in columns.items() if column[i] == column[i]}
+        rows.append({
+            "time": datetime.fromtimestamp(t, tz=dt_timezone.utc).astimezone(tz).isoformat(timespec="minutes"),
+            **shape_weather(values)
+        })
+    return rows
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+from services.cache import env_int
+from services.weather_client import FORECAST_SLOT_S, WEATHER_SLOT_S, WEATHER_STALE_S
+
+
+# Part of every ETag, so a deploy that changes any output invalidates them
+BUILD_ID = os.environ.get("BUILD_ID") or os.environ.get("RENDER_GIT_COMMIT") or "1.0.0"
+
+# Astronomy for a pinned date never changes; "today" changes at midnight
+ASTRONOMY_MAX_AGE = env_int("ASTRONOMY_MAX_AGE", 365 * 24 * 3600)
+
+# Headers browsers on another origin may read
+EXPOSED_HEADERS = [
+    "ETag", "X-Astronomy-ETag", "X-Astronomy-Cache-Control", "X-Weather-ETag", "X-Weather-Cache-Control",
+    "Server-Timing", "X-Profile"
+]
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over normalized request inputs (or, for weather, the data served)."""
+    digest = hashlib.blake2b(repr((BUILD_ID, *parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def is_pinned(date_str: Optional[str], target_date: date) -> bool:
+    """Whether the request named its date explicitly, as opposed to defaulting to today."""
+    return date_str is not None and date_str == target_date.isoformat()
+
+
+def astronomy_cache_control(pinned: bool) -> str:
+    if pinned:
+        return f"public, max-age={ASTRONOMY_MAX_AGE}, immutable"
+    # "Today" rolls over at the server's midnight
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return f"public, max-age={max(1, int((midnight - now).total_seconds()))}"
+
+
+def weather_etag(weather: Any) -> str:
+    """ETag over the weather actually served.
+
+    A stale or missing answer never shares a tag with the fresh one for
+    the same slot, so clients can't be pinned to it by 304s.
+    """
+    return make_etag("weather", weather)
+
+
+def weather_cache_control(weather: Any, fresh: bool, current: bool) -> str:
+    """Cache-Control for served weather.
+
+    Fresh weather is cacheable until its upstream slot ends; stale weather
+    must be revalidated on every use, and a missing answer is not stored.
+    """
+    if weather is None:
+        return "no-store"
+    if not fresh:
+        return "no-cache"
+    slot_s = WEATHER_SLOT_S if current else FORECAST_SLOT_S
+    now = time.time()
+    max_age = max(1, int((now // slot_s + 1) * slot_s - now))
+    return f"public, max-age={max_age}, stale-while-revalidate={int(WEATHER_STALE_S)}"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def conditional(request: Request, response: Response, etag: str, cache_control: str,
+                **extra_headers: str) -> Optional[Response]:
+    """Set caching headers on ``response``; return a 304 to send instead if the client is current."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    headers.update((name.replace("_", "-"), value) for name, value in extra_headers.items())
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
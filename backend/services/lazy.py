@@ -0,0 +1,44 @@
+import importlib
+import threading
+from types import ModuleType
+
+
+# One lock for every deferred import: packages such as timezonefinder and h3
+# import each other's submodules, and two threads importing them at once
+# can see a partially initialized module.
+_import_lock = threading.RLock()
+
+
+class LazyModule:
+    """Stand-in for a module that is only imported on first attribute access.
+
+    Keeps heavy dependencies off the cold-start path; the app's warm-up
+    touches them in the background. All first loads are serialized on one
+    lock, so a request racing the warm-up waits for the import instead of
+    seeing a half-imported package. Looked-up attributes are cached on the
+    proxy.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def load(self) -> ModuleType:
+        if self._module is None:
+            with _import_lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        value = getattr(self.load(), attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
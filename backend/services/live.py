@@ -0,0 +1,139 @@
+import asyncio
+import math
+from datetime import date, datetime
+from typing import Any, Optional
+
+import pytz
+
+from services.astronomy import SOLAR_MODES, calculate_lunar, calculate_tides, get_timezone_from_coords
+from services.cache import env_float
+from services.executor import run_in_pool
+from services.prayer_times import calculate_prayer_times
+from services.weather_client import weather_version
+from services.weather_provider import fetch_marine_weather
+
+
+# Prayer and twilight times are shown to the minute, which moves by about
+# a minute per 25 km east-west, so smaller moves keep the last answer.
+LIVE_RECOMPUTE_KM = env_float("LIVE_RECOMPUTE_KM", 5.0)
+
+# With no new fix, re-check the date and weather slot this often
+LIVE_TICK_S = env_float("LIVE_TICK_S", 60.0)
+
+EARTH_RADIUS_KM = 6371.0
+
+_stats = {"sessions": 0, "fixes": 0, "astronomy_updates": 0, "weather_updates": 0, "patches": 0}
+
+
+def distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def merge_patch(old: Any, new: Any) -> Any:
+    """JSON merge patch (RFC 7386) turning ``old`` into ``new``; None when they are equal."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return None if old == new else new
+    patch = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        if value is None:
+            # RFC 7386 has no "set to null": deleting the key is the nearest the client can see
+            if old[key] is not None:
+                patch[key] = None
+            continue
+        change = merge_patch(old[key], value)
+        if change is not None:
+            patch[key] = change
+    return patch or None
+
+
+def local_today(timezone: str) -> date:
+    return datetime.now(pytz.timezone(timezone)).date()
+
+
+def compute_astronomy(lat: float, lng: float, prayer_method: str, mode: str) -> dict:
+    """Timezone, local date and the astronomy sections for a fix, in one pool call."""
+    timezone = get_timezone_from_coords(lat, lng)
+    target_date = local_today(timezone)
+    lunar = calculate_lunar(lat, lng, target_date, timezone)
+    return {
+        "date": target_date.isoformat(),
+        "timezone": timezone,
+        "solar": SOLAR_MODES[mode](lat, lng, target_date, timezone),
+        "prayer": calculate_prayer_times(lat, lng, target_date, timezone, prayer_method),
+        "lunar": lunar,
+        "tides": calculate_tides(lunar["illumination"]),
+    }
+
+
+class LiveSession:
+    """Dashboard state for one live-position connection.
+
+    Astronomy is recomputed only when the vessel has moved more than
+    LIVE_RECOMPUTE_KM from where it was last computed, or the local date has
+    rolled over; weather only when the fix enters a new weather grid cell or
+    upstream update slot. Each update returns a merge patch against the
+    state the client already has.
+    """
+
+    def __init__(self, prayer_method: str = "muslim_world_league", mode: str = "fast"):
+        self.prayer_method = prayer_method
+        self.mode = mode
+        self.anchor: Optional[tuple] = None
+        self.weather_version: Optional[tuple] = None
+        self.state: dict = {}
+        _stats["sessions"] += 1
+
+    def _astronomy_stale(self, lat: float, lng: float) -> bool:
+        if self.anchor is None:
+            return True
+        if distance_km(*self.anchor, lat, lng) > LIVE_RECOMPUTE_KM:
+            return True
+        return local_today(self.state["timezone"]).isoformat() != self.state["date"]
+
+    async def update(self, lat: float, lng: float) -> Optional[dict]:
+        """Apply a fix and return the patch for the client, or None if nothing visible changed."""
+        _stats["fixes"] += 1
+        tasks = {}
+        version = weather_version(lat, lng, True)
+        if version != self.weather_version:
+            tasks["weather"] = asyncio.ensure_future(fetch_marine_weather(lat, lng))
+        if self._astronomy_stale(lat, lng):
+            tasks["astronomy"] = asyncio.ensure_future(
+                run_in_pool(compute_astronomy, lat, lng, self.prayer_method, self.mode)
+            )
+        try:
+            results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        state = dict(self.state, coordinates={"lat": lat, "lng": lng})
+        if "astronomy" in results:
+            _stats["astronomy_updates"] += 1
+            self.anchor = (lat, lng)
+            state.update(results["astronomy"])
+        if "weather" in results:
+            _stats["weather_updates"] += 1
+            # Without an answer, the next fix tries again rather than waiting for the next slot
+            if results["weather"] is not None:
+                self.weather_version = version
+            state["weather"] = results["weather"]
+
+        # Coordinates alone don't make a patch worth sending
+        patch = merge_patch(self.state, state) if tasks else None
+        self.state = state
+        if patch:
+            _stats["patches"] += 1
+        return patch
+
+
+def live_stats() -> dict:
+    return dict(_stats)
@@ -0,0 +1,82 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, timezone
+from typing import Optional
+
+
+# Packed table written by scripts/generate_lunations.py: a 16-byte header
+# (magic, version, phase of the first entry, count) followed by int64
+# little-endian Unix seconds of every principal phase in order.
+TABLE_PATH = os.environ.get(
+    "LUNATIONS_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "lunations.bin")
+)
+HEADER = struct.Struct("<4sHHI4x")
+MAGIC = b"LUNA"
+VERSION = 1
+
+NEW_MOON, FIRST_QUARTER, FULL_MOON, LAST_QUARTER = range(4)
+
+_table = None
+_first_phase = NEW_MOON
+
+
+def load_table():
+    """Memory-map the lunation table on first use; None if it's missing or invalid."""
+    global _table, _first_phase
+    if _table is None:
+        try:
+            with open(TABLE_PATH, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            _table = False
+            return None
+        magic, version, first_phase, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or len(data) != HEADER.size + 8 * count:
+            _table = False
+            return None
+        if sys.byteorder == "little":
+            _table = memoryview(data)[HEADER.size:].cast("q")
+        else:
+            _table = array("q", data[HEADER.size:])
+            _table.byteswap()
+        _first_phase = first_phase
+    return _table or None
+
+
+def next_phase(t: float, phase: int) -> Optional[int]:
+    """Unix time of the first ``phase`` instant strictly after ``t``, or None outside the table."""
+    table = load_table()
+    if table is None:
+        return None
+    idx = bisect_right(table, t)
+    if idx == 0:
+        return None
+    idx += (phase - (_first_phase + idx)) % 4
+    return table[idx] if idx < len(table) else None
+
+
+def lunation_fraction(t: float) -> Optional[float]:
+    """How far ``t`` is through the current lunation (0 = new moon), or None outside the table."""
+    table = load_table()
+    if table is None:
+        return None
+    idx = bisect_right(table, t) - 1
+    idx -= (_first_phase + idx) % 4
+    if idx < 0 or idx + 4 >= len(table):
+        return None
+    start, end = table[idx], table[idx + 4]
+    return (t - start) / (end - start)
+
+
+def to_epoch(d: date, hour: int = 0) -> float:
+    return datetime(d.year, d.month, d.day, hour, tzinfo=timezone.utc).timestamp()
+
+
+def next_phase_date(target_date: date, phase: int) -> Optional[date]:
+    """UTC date of the first ``phase`` after midnight UTC on ``target_date``."""
+    t = next_phase(to_epoch(target_date), phase)
+    return datetime.fromtimestamp(t, tz=timezone.utc).date() if t is not None else None
@@ -0,0 +1,193 @@
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from services.cache import all_cache_stats
+
+
+# Upper bounds in seconds, from sub-millisecond math to the upstream timeout
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stage durations of the request being handled, for its Server-Timing header
+_request_stages: ContextVar[Optional[list]] = ContextVar("request_stages", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set.
+
+    Recording is a bisect and three increments under a lock; the text
+    exposition is only built when /metrics is scraped.
+    """
+
+    def __init__(self, name: str, help: str, labels: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series: "dict[tuple, list]" = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *values: str) -> None:
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+            series[0][bisect_left(BUCKETS, seconds)] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(values, list(counts), total, n) for values, (counts, total, n) in self._series.items()]
+        for values, counts, total, n in sorted(series):
+            labels = _labels(self.labels, values)
+            cumulative = 0
+            for bound, count in zip((*BUCKETS, "+Inf"), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {n}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: "dict[tuple, int]" = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values: str) -> None:
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        lines.extend(f"{self.name}{{{_labels(self.labels, key)}}} {value}" for key, value in values)
+        return lines
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+request_duration = Histogram("navapp_request_duration_seconds", "Request latency per route.", ("method", "route"))
+stage_duration = Histogram("navapp_stage_duration_seconds", "Duration of each instrumented stage.", ("stage",))
+upstream_responses = Counter("navapp_upstream_responses_total", "Upstream API responses by status.", ("api", "status"))
+
+
+def record_stage(name: str, seconds: float) -> None:
+    stage_duration.observe(seconds, name)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as stage ``name`` (works across awaits within one task)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of a function, sync or async, as stage ``name``."""
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    record_stage(name, time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_stage(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def server_timing(stages: list, total: float) -> str:
+    """Server-Timing header value, summing repeated stages."""
+    durations = {}
+    for name, seconds in stages:
+        durations[name] = durations.get(name, 0.0) + seconds
+    durations["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items())
+
+
+class TimingMiddleware:
+    """ASGI middleware adding Server-Timing to every response and recording route latency.
+
+    Stages finished before the response headers are sent appear in the
+    header; for streamed responses later stages only reach /metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages = []
+        token = _request_stages.set(stages)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                header = server_timing(stages, time.perf_counter() - started)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode()),
+                                      (b"timing-allow-origin", b"*")]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stages.reset(token)
+            route = scope.get("route")
+            request_duration.observe(time.perf_counter() - started, scope["method"],
+                                     route.path if route is not None else "unmatched")
+
+
+def render_metrics(extra: Optional[dict] = None) -> str:
+    """Prometheus text exposition of every metric, plus cache counters read at scrape time."""
+    lines = []
+    for metric in (request_duration, stage_duration, upstream_responses):
+        lines.extend(metric.render())
+
+    caches = all_cache_stats()
+    for name, kind, help in (
+        ("hits", "counter", "Cache lookups that found a fresh entry."),
+        ("misses", "counter", "Cache lookups that found nothing fresh."),
+        ("evictions", "counter", "Entries evicted to stay within bounds."),
+        ("hit_ratio", "gauge", "Hits over lookups since start."),
+        ("entries", "gauge", "Entries currently held."),
+    ):
+        metric = f"navapp_cache_{name}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {metric} {help}", f"# TYPE {metric} {kind}"]
+        lines.extend(f'{metric}{{cache="{cache}"}} {stats[name]}' for cache, stats in sorted(caches.items()))
+
+    for metric, (kind, help, samples) in (extra or {}).items():
+        lines += [f"# HELP {metric} {help}", f"# TYPE {metric} {kind}"]
+        lines.extend(f"{metric}{{{labels}}} {value}" for labels, value in samples)
+    return "\n".join(lines) + "\n"
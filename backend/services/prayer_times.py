@@ -1,7 +1,10 @@
 from datetime import date, datetime
 import math
+import numpy as np
 import pytz
 
+from services.metrics import timed
+
 
 # Prayer calculation methods with their angles
 METHODS = {
@@ -15,6 +18,7 @@ METHODS = {
 }
 
 
+@timed("prayer")
 def calculate_prayer_times(lat: float, lng: float, target_date: date, timezone: str, method: str = "muslim_world_league") -> dict:
     """Calculate Islamic prayer times using solar position calculations."""
 
@@ -146,3 +150,103 @@ def calculate_prayer_times(lat: float, lng: float, target_date: date, timezone:
         "isha": format_time(isha),
         "method": method_params["name"]
     }
+
+
+def timezone_offsets(dates, timezones) -> np.ndarray:
+    """UTC offsets in hours at local midnight for each (date, timezone) pair."""
+    dates, timezones = np.broadcast_arrays(np.asarray(dates, dtype="datetime64[D]"), np.asarray(timezones))
+    pairs = list(zip(dates.ravel().tolist(), timezones.ravel().tolist()))
+    # Resolve each distinct (date, timezone) once
+    offsets = {
+        (d, tz_str): pytz.timezone(tz_str).localize(datetime.combine(d, datetime.min.time())).utcoffset().total_seconds() / 3600
+        for d, tz_str in set(pairs)
+    }
+    return np.fromiter((offsets[pair] for pair in pairs), dtype=float, count=len(pairs)).reshape(dates.shape)
+
+
+@timed("prayer_array")
+def calculate_prayer_times_array(lats, lngs, dates, tz_offsets, method: str = "muslim_world_league") -> dict:
+    """Vectorized calculate_prayer_times over arrays of coordinates and dates.
+
+    Inputs broadcast against each other; ``dates`` is anything convertible to
+    ``datetime64[D]`` and ``tz_offsets`` are UTC offsets in hours (see
+    ``timezone_offsets``). Returns local times as fractional hours, with NaN
+    wherever the sun never reaches the required angle.
+    """
+    method_params = METHODS.get(method, METHODS["muslim_world_league"])
+    lat, lng, d, offset = np.broadcast_arrays(
+        np.asarray(lats, dtype=float),
+        np.asarray(lngs, dtype=float),
+        np.asarray(dates, dtype="datetime64[D]"),
+        np.asarray(tz_offsets, dtype=float),
+    )
+
+    # Julian date calculation
+    year = d.astype("datetime64[Y]").astype(np.int64) + 1970
+    month = d.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    day = (d - d.astype("datetime64[M]")).astype(np.int64) + 1
+    early = month <= 2
+    year = np.where(early, year - 1, year)
+    month = np.where(early, month + 12, month)
+
+    A = np.floor(year / 100)
+    B = 2 - A + np.floor(A / 4)
+    JD = np.floor(365.25 * (year + 4716)) + np.floor(30.6001 * (month + 1)) + day + B - 1524.5
+    D = JD - 2451545.0
+
+    g = (357.529 + 0.98560028 * D) % 360
+    q = (280.459 + 0.98564736 * D) % 360
+    L = (q + 1.915 * np.sin(np.radians(g)) + 0.020 * np.sin(np.radians(2 * g))) % 360
+    e = 23.439 - 0.00000036 * D
+    decl = np.degrees(np.arcsin(np.sin(np.radians(e)) * np.sin(np.radians(L))))
+
+    RA = np.degrees(np.arctan2(np.cos(np.radians(e)) * np.sin(np.radians(L)), np.cos(np.radians(L)))) / 15
+    RA = np.where(RA < 0, RA + 24, RA)
+    EqT = q / 15 - RA
+    EqT = np.where(EqT > 12, EqT - 24, np.where(EqT < -12, EqT + 24, EqT))
+
+    dhuhr = 12 + (-lng / 15) - EqT + offset
+
+    sin_lat, cos_lat = np.sin(np.radians(lat)), np.cos(np.radians(lat))
+    sin_decl, cos_decl = np.sin(np.radians(decl)), np.cos(np.radians(decl))
+
+    def hour_angle(altitude) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cos_t = (np.sin(np.radians(altitude)) - sin_lat * sin_decl) / (cos_lat * cos_decl)
+        # Polar day/night: mask instead of raising
+        cos_t = np.where((cos_t > 1) | (cos_t < -1), np.nan, cos_t)
+        return np.degrees(np.arccos(cos_t)) / 15
+
+    fajr = dhuhr - hour_angle(-method_params["fajr"])
+    sunrise = dhuhr - hour_angle(-0.833)
+    maghrib = dhuhr + hour_angle(-0.833)
+
+    zenith_at_noon = np.abs(lat - decl)
+    with np.errstate(divide="ignore"):
+        asr_altitude = np.degrees(np.arctan(1 / (1 + np.tan(np.radians(zenith_at_noon)))))
+    asr = dhuhr + hour_angle(asr_altitude)
+
+    if method_params.get("isha_is_minutes"):
+        isha = maghrib + method_params["isha"] / 60
+    else:
+        isha = dhuhr + hour_angle(-method_params["isha"])
+
+    return {
+        "fajr": fajr,
+        "sunrise": sunrise,
+        "dhuhr": dhuhr,
+        "asr": asr,
+        "maghrib": maghrib,
+        "isha": isha,
+        "method": method_params["name"]
+    }
+
+
+def format_times_array(hours: np.ndarray) -> list:
+    """Format fractional hours as HH:MM strings, "N/A" where undefined."""
+    hours = np.asarray(hours, dtype=float).ravel()
+    valid = ~np.isnan(hours)
+    wrapped = np.where(valid, hours, 0) % 24
+    h = wrapped.astype(np.int64)
+    m = ((wrapped - h) * 60).astype(np.int64)
+    return [f"{hh:02d}:{mm:02d}" if ok else "N/A" for hh, mm, ok in zip(h.tolist(), m.tolist(), valid.tolist())]
@@ -0,0 +1,220 @@
+import asyncio
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Optional
+from urllib.parse import parse_qsl, urlencode
+
+from services.cache import env_float
+
+
+# Profiling is off unless a token is configured. A request opts in with
+# "X-Profile: <token>" or "?profile=<token>"; "X-Profile-Mode" or
+# "?profile_mode=" picks "deterministic" (cProfile) or "sampling".
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "..", "profiles"))
+PROFILE_MIN_INTERVAL_S = env_float("PROFILE_MIN_INTERVAL_S", 10.0)
+PROFILE_SAMPLE_MS = env_float("PROFILE_SAMPLE_MS", 1.0)
+
+MODES = ("deterministic", "sampling")
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+# One profile at a time, no more often than PROFILE_MIN_INTERVAL_S
+_lock = threading.Lock()
+_state = {"active": False, "last_started": 0.0, "profiles": 0, "rejected": 0}
+
+
+class _Sampler(threading.Thread):
+    """Samples the stacks of the registered threads every ``interval`` seconds."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.threads: "set[int]" = set()
+        self.stacks: Counter = Counter()
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self.threads):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[_folded(frame)] += 1
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+def _folded(frame) -> str:
+    """One stack in the collapsed format flame graph tools read, root first."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class RequestProfile:
+    """Profile of one request across the event loop thread and the pool threads it uses."""
+
+    def __init__(self, mode: str, tags: dict):
+        self.mode = mode
+        self.tags = tags
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        route = re.sub(r"[^A-Za-z0-9]+", "_", tags["path"]).strip("_") or "root"
+        self.name = f"{stamp}-{route}-{os.getpid()}-{_state['profiles']}"
+        self._profilers: "list[cProfile.Profile]" = []
+        self._sampler: Optional[_Sampler] = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        if self.mode == "sampling":
+            self._sampler = _Sampler(PROFILE_SAMPLE_MS / 1000)
+            self._sampler.threads.add(threading.get_ident())
+            self._sampler.start()
+        else:
+            profiler = cProfile.Profile()
+            self._profilers.append(profiler)
+            profiler.enable()
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self._started
+        if self._sampler is not None:
+            self._sampler.stop()
+        else:
+            self._profilers[0].disable()
+
+    def wrap(self, call: Callable) -> Callable:
+        """Make ``call`` profile itself on whichever pool thread runs it."""
+        def run():
+            if self._sampler is not None:
+                ident = threading.get_ident()
+                self._sampler.threads.add(ident)
+                try:
+                    return call()
+                finally:
+                    self._sampler.threads.discard(ident)
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return call()
+            finally:
+                profiler.disable()
+                self._profilers.append(profiler)
+        return run
+
+    def write(self, directory: str = PROFILE_DIR) -> str:
+        """Dump the profile and a JSON sidecar with the request tags; returns the profile path."""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.name)
+        if self._sampler is not None:
+            path = base + ".folded"
+            with open(path, "w") as f:
+                f.writelines(f"{stack} {count}\n" for stack, count in self._sampler.stacks.most_common())
+        else:
+            path = base + ".prof"
+            stats = pstats.Stats(self._profilers[0])
+            for profiler in self._profilers[1:]:
+                stats.add(profiler)
+            stats.dump_stats(path)
+        with open(base + ".json", "w") as f:
+            json.dump({**self.tags, "mode": self.mode, "duration_ms": round(self.duration * 1000, 2),
+                       "profile": os.path.basename(path)}, f, indent=2)
+        return path
+
+
+def wrap_call(call: Callable) -> Callable:
+    """Profile ``call`` in its worker thread if the current request is being profiled."""
+    profile = _current.get()
+    return profile.wrap(call) if profile is not None else call
+
+
+def _acquire() -> bool:
+    with _lock:
+        now = time.monotonic()
+        if _state["active"] or now - _state["last_started"] < PROFILE_MIN_INTERVAL_S:
+            _state["rejected"] += 1
+            return False
+        _state["active"] = True
+        _state["last_started"] = now
+        _state["profiles"] += 1
+        return True
+
+
+def _release() -> None:
+    with _lock:
+        _state["active"] = False
+
+
+def profiling_stats() -> dict:
+    return {"enabled": bool(PROFILE_TOKEN), "directory": os.path.normpath(PROFILE_DIR), **_state}
+
+
+class ProfilingMiddleware:
+    """ASGI middleware running token-authorized requests under a profiler.
+
+    The response carries "X-Profile" with the file name the profile is
+    written to once the request finishes, or "rate-limited" when another
+    profile is running or one was taken too recently. Requests without a
+    valid token pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILE_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        query = parse_qsl(scope.get("query_string", b"").decode())
+        token = headers.get(b"x-profile", b"").decode() or dict(query).get("profile", "")
+        if not token or not hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode()):
+            await self.app(scope, receive, send)
+            return
+
+        mode = headers.get(b"x-profile-mode", b"").decode() or dict(query).get("profile_mode", "deterministic")
+        if not _acquire():
+            await self.app(scope, receive, _with_header(send, "rate-limited"))
+            return
+
+        # Tag with the request parameters, minus the token
+        params = [(k, v) for k, v in query if k not in ("profile", "profile_mode")]
+        profile = RequestProfile(mode if mode in MODES else MODES[0], {
+            "method": scope["method"], "path": scope["path"], "query": urlencode(params),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        })
+        reset_token = _current.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, _with_header(send, profile.name))
+        finally:
+            profile.stop()
+            _current.reset(reset_token)
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, profile.write)
+            finally:
+                _release()
+
+
+def _with_header(send, value: str):
+    async def send_with_header(message):
+        if message["type"] == "http.response.start":
+            message["headers"] = [*message.get("headers", []), (b"x-profile", value.encode())]
+        await send(message)
+    return send_with_header
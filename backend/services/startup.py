@@ -0,0 +1,58 @@
+import logging
+import resource
+import time
+
+from services.astronomy import astral, astral_sun, ephem
+from services.executor import run_in_pool
+from services.lunations import load_table
+from services.tides import load_stations
+from services.timezones import warm_timezone_index
+from services.weather_client import start_client
+
+
+logger = logging.getLogger(__name__)
+
+_state = {"warmed": False, "warm_up_ms": None, "error": None}
+
+
+def rss_mb() -> float:
+    """Resident set size of this process in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _warm_services() -> int:
+    for module in (ephem, astral, astral_sun):
+        module.load()
+    load_table()
+    load_stations()
+    return warm_timezone_index()
+
+
+async def warm_up() -> None:
+    """Load the heavy dependencies and shared data after the app starts serving.
+
+    Requests that arrive first load whatever they need on demand, so this
+    only moves the cost off the first user-facing request. Runs as a task
+    nobody awaits, so failures are logged and recorded rather than raised.
+    """
+    started = time.perf_counter()
+    try:
+        await start_client()
+        await run_in_pool(_warm_services)
+    except Exception as exc:
+        logger.exception("Startup warm-up failed")
+        _state["error"] = repr(exc)
+        return
+    _state["warmed"] = True
+    _state["warm_up_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def startup_stats() -> dict:
+    return {**_state, "rss_mb": rss_mb()}
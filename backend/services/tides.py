@@ -0,0 +1,273 @@
+import json
+import logging
+import math
+import os
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Optional
+
+import numpy as np
+import pytz
+
+from services.cache import env_float
+from services.metrics import timed
+
+
+# Harmonic constants per station; see data/tide_stations.example.json for
+# the format. Without a station file, tide prediction is simply disabled.
+TIDE_STATIONS_PATH = os.environ.get(
+    "TIDE_STATIONS_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "tide_stations.json")
+)
+TIDE_STATION_MAX_KM = env_float("TIDE_STATION_MAX_KM", 100.0)
+
+MAX_TIDE_DAYS = 31
+
+EARTH_RADIUS_KM = 6371.0
+
+# Doodson numbers (tau, s, h, p, N', p1) and phase offset in degrees
+CONSTITUENTS = {
+    "M2": ((2, 0, 0, 0, 0, 0), 0),
+    "S2": ((2, 2, -2, 0, 0, 0), 0),
+    "N2": ((2, -1, 0, 1, 0, 0), 0),
+    "K2": ((2, 2, 0, 0, 0, 0), 0),
+    "2N2": ((2, -2, 0, 2, 0, 0), 0),
+    "MU2": ((2, -2, 2, 0, 0, 0), 0),
+    "NU2": ((2, -1, 2, -1, 0, 0), 0),
+    "L2": ((2, 1, 0, -1, 0, 0), 180),
+    "T2": ((2, 2, -3, 0, 0, 1), 0),
+    "K1": ((1, 1, 0, 0, 0, 0), 90),
+    "O1": ((1, -1, 0, 0, 0, 0), -90),
+    "P1": ((1, 1, -2, 0, 0, 0), -90),
+    "Q1": ((1, -2, 0, 1, 0, 0), -90),
+    "J1": ((1, 2, 0, -1, 0, 0), 90),
+    "OO1": ((1, 3, 0, 0, 0, 0), 90),
+    "M4": ((4, 0, 0, 0, 0, 0), 0),
+    "MS4": ((4, 2, -2, 0, 0, 0), 0),
+    "MN4": ((4, -1, 0, 1, 0, 0), 0),
+    "S4": ((4, 4, -4, 0, 0, 0), 0),
+    "M6": ((6, 0, 0, 0, 0, 0), 0),
+    "MF": ((0, 2, 0, 0, 0, 0), 0),
+    "MM": ((0, 1, 0, -1, 0, 0), 0),
+    "SSA": ((0, 0, 2, 0, 0, 0), 0),
+    "SA": ((0, 0, 1, 0, 0, 0), 0),
+}
+
+# Rates of the Doodson arguments in degrees per hour
+_S_RATE, _H_RATE, _P_RATE, _N_RATE, _P1_RATE = 0.54901653, 0.04106864, 0.00464183, 0.00220641, 0.00000196
+DOODSON_RATES = np.array([15 + _H_RATE - _S_RATE, _S_RATE, _H_RATE, _P_RATE, _N_RATE, _P1_RATE])
+
+
+def _astronomical_arguments(t: datetime) -> np.ndarray:
+    """Doodson arguments (tau, s, h, p, N', p1) in degrees at a UTC instant."""
+    T = (t - datetime(2000, 1, 1, 12, tzinfo=dt_timezone.utc)).total_seconds() / (36525 * 86400)
+    s = 218.3164591 + 481267.88134236 * T
+    h = 280.46645 + 36000.7697489 * T
+    p = 83.3532430 + 4069.0137111 * T
+    n = 125.0445550 - 1934.1361849 * T
+    p1 = 282.93735 + 1.71946 * T
+    hours = t.hour + t.minute / 60 + t.second / 3600
+    tau = 15 * hours + 180 + h - s
+    return np.array([tau, s, h, p, -n, p1]) % 360
+
+
+def _nodal_factors(name: str, n: float) -> tuple:
+    """Nodal amplitude factor f and phase correction u (degrees) for node longitude n (radians)."""
+    c, c2, c3 = math.cos(n), math.cos(2 * n), math.cos(3 * n)
+    s, s2, s3 = math.sin(n), math.sin(2 * n), math.sin(3 * n)
+    m2 = (1.0004 - 0.0373 * c + 0.0002 * c2, -2.14 * s)
+    if name in ("M2", "N2", "2N2", "MU2", "NU2", "L2", "MS4"):
+        return m2
+    if name in ("M4", "MN4"):
+        return m2[0] ** 2, 2 * m2[1]
+    if name == "M6":
+        return m2[0] ** 3, 3 * m2[1]
+    if name == "K2":
+        return 1.0241 + 0.2863 * c + 0.0083 * c2 - 0.0015 * c3, -17.74 * s + 0.68 * s2 - 0.04 * s3
+    if name == "K1":
+        return 1.0060 + 0.1150 * c - 0.0088 * c2 + 0.0006 * c3, -8.86 * s + 0.68 * s2 - 0.07 * s3
+    if name in ("O1", "Q1"):
+        return 1.0089 + 0.1871 * c - 0.0147 * c2 + 0.0014 * c3, 10.80 * s - 1.34 * s2 + 0.19 * s3
+    if name == "J1":
+        return 1.0129 + 0.1676 * c - 0.0170 * c2 + 0.0016 * c3, -12.94 * s + 1.34 * s2 - 0.19 * s3
+    if name == "OO1":
+        return 1.1027 + 0.6504 * c + 0.0317 * c2 - 0.0014 * c3, -36.68 * s + 4.02 * s2 - 0.57 * s3
+    if name == "MF":
+        return 1.0429 + 0.4135 * c - 0.004 * c2, -23.74 * s + 2.68 * s2 - 0.38 * s3
+    if name == "MM":
+        return 1.0 - 0.1300 * c + 0.0013 * c2, 0.0
+    return 1.0, 0.0
+
+
+class TideStation:
+    """Harmonic constants for one station, with per-year terms precomputed on demand."""
+
+    def __init__(self, station_id: str, name: str, lat: float, lng: float, z0: float,
+                 constituents: list, amplitudes: list, phases: list):
+        self.id = station_id
+        self.name = name
+        self.lat = lat
+        self.lng = lng
+        self.z0 = z0
+        self.constituents = constituents
+        self.amplitudes = np.asarray(amplitudes, dtype=float)
+        self.phases = np.asarray(phases, dtype=float)
+        if self.amplitudes.shape != (len(constituents),) or self.phases.shape != (len(constituents),):
+            raise ValueError(f"station {station_id}: expected {len(constituents)} amplitudes and phases")
+        doodson = np.array([CONSTITUENTS[c][0] for c in constituents], dtype=float)
+        self.offsets = np.array([CONSTITUENTS[c][1] for c in constituents], dtype=float)
+        self.doodson = doodson
+        # Angular speeds in radians per second
+        self.speeds = np.radians(doodson @ DOODSON_RATES) / 3600
+        self._years = {}
+
+    def year_terms(self, year: int) -> tuple:
+        """(epoch seconds of Jan 1, f * amplitude, phase at epoch in radians) for a year.
+
+        Nodal factors are evaluated at mid-year and equilibrium arguments at
+        the start of the year, as is standard for yearly predictions.
+        """
+        terms = self._years.get(year)
+        if terms is None:
+            start = datetime(year, 1, 1, tzinfo=dt_timezone.utc)
+            mid = datetime(year, 7, 2, tzinfo=dt_timezone.utc)
+            v0 = self.doodson @ _astronomical_arguments(start) + self.offsets
+            node = -math.radians(_astronomical_arguments(mid)[4])
+            f, u = np.array([_nodal_factors(c, node) for c in self.constituents]).T
+            terms = (start.timestamp(), f * self.amplitudes, np.radians(v0 + u - self.phases))
+            self._years[year] = terms
+        return terms
+
+    def _evaluate(self, t: np.ndarray, derivative: int) -> np.ndarray:
+        out = np.empty(t.shape)
+        if not t.size:
+            return out
+        first, last = (datetime.fromtimestamp(x, tz=dt_timezone.utc).year for x in (t.min(), t.max()))
+        for year in range(first, last + 1):
+            start, amp, phase = self.year_terms(year)
+            end = datetime(year + 1, 1, 1, tzinfo=dt_timezone.utc).timestamp()
+            mask = (t >= start) & (t < end)
+            if not mask.any():
+                continue
+            angle = np.outer(t[mask] - start, self.speeds) + phase
+            if derivative == 0:
+                out[mask] = self.z0 + np.cos(angle) @ amp
+            elif derivative == 1:
+                out[mask] = -np.sin(angle) @ (amp * self.speeds)
+            else:
+                out[mask] = -np.cos(angle) @ (amp * self.speeds ** 2)
+        return out
+
+    def heights(self, t) -> np.ndarray:
+        """Predicted heights in metres for an array of Unix times."""
+        return self._evaluate(np.atleast_1d(np.asarray(t, dtype=float)), 0)
+
+    def extremes(self, start: float, end: float, step: float = 360.0) -> list:
+        """High and low waters in [start, end) as (unix time, height, "high"|"low").
+
+        Sign changes of the analytic derivative on a ``step``-second grid are
+        polished with a few Newton iterations on the derivative.
+        """
+        grid = np.arange(start - step, end + step, step)
+        slope = self._evaluate(grid, 1)
+        idx = np.nonzero(np.signbit(slope[:-1]) != np.signbit(slope[1:]))[0]
+        lo, hi = grid[idx], grid[idx + 1]
+        t = (lo + hi) / 2
+        for _ in range(4):
+            t = np.clip(t - self._evaluate(t, 1) / self._evaluate(t, 2), lo, hi)
+        keep = (t >= start) & (t < end)
+        t = t[keep]
+        heights = self._evaluate(t, 0)
+        kinds = np.where(self._evaluate(t, 2) < 0, "high", "low")
+        return list(zip(t.tolist(), heights.tolist(), kinds.tolist()))
+
+
+class StationIndex:
+    """Stations sorted by latitude; nearest lookups scan only the latitude band in range."""
+
+    def __init__(self, stations: list):
+        self.stations = sorted(stations, key=lambda s: s.lat)
+        self.lats = [s.lat for s in self.stations]
+        self.lat_rad = np.radians(self.lats)
+        self.lng_rad = np.radians([s.lng for s in self.stations])
+
+    def nearest(self, lat: float, lng: float, max_km: float = TIDE_STATION_MAX_KM) -> Optional[tuple]:
+        band = math.degrees(max_km / EARTH_RADIUS_KM)
+        lo, hi = bisect_left(self.lats, lat - band), bisect_right(self.lats, lat + band)
+        if lo >= hi:
+            return None
+        phi, lam = math.radians(lat), math.radians(lng)
+        dphi = self.lat_rad[lo:hi] - phi
+        dlam = self.lng_rad[lo:hi] - lam
+        a = np.sin(dphi / 2) ** 2 + math.cos(phi) * np.cos(self.lat_rad[lo:hi]) * np.sin(dlam / 2) ** 2
+        dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+        best = int(np.argmin(dist))
+        if dist[best] > max_km:
+            return None
+        return self.stations[lo + best], float(dist[best])
+
+
+logger = logging.getLogger(__name__)
+
+_index = None
+
+
+def load_stations(path: str = TIDE_STATIONS_PATH) -> Optional[StationIndex]:
+    """Load the station file once; None if there isn't one or it can't be parsed."""
+    global _index
+    if _index is None:
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            names = data["constituents"]
+            _index = StationIndex([
+                TideStation(s["id"], s["name"], s["lat"], s["lng"], s.get("z0", 0.0), names,
+                            s["amplitude"], s["phase"])
+                for s in data["stations"]
+            ])
+        except OSError:
+            _index = False
+        except (ValueError, KeyError, TypeError) as exc:
+            # Remembered like a missing file, so the error is logged once, not per request
+            logger.error("Tide predictions disabled: invalid station file %s: %r", path, exc)
+            _index = False
+    return _index or None
+
+
+@timed("tide_prediction")
+def predict_tides(lat: float, lng: float, target_date: date, timezone: str, days: int = 1,
+                  interval_minutes: Optional[int] = None) -> Optional[dict]:
+    """High/low waters (and optionally a height series) at the nearest station, or None."""
+    index = load_stations()
+    found = index.nearest(lat, lng) if index else None
+    if found is None:
+        return None
+    station, distance = found
+
+    tz = pytz.timezone(timezone)
+    start = tz.localize(datetime.combine(target_date, datetime.min.time())).timestamp()
+    end = tz.localize(datetime.combine(target_date + timedelta(days=days), datetime.min.time())).timestamp()
+
+    def local(t: float) -> str:
+        return datetime.fromtimestamp(t, tz=dt_timezone.utc).astimezone(tz).isoformat(timespec="minutes")
+
+    result = {
+        "station": {
+            "id": station.id,
+            "name": station.name,
+            "lat": station.lat,
+            "lng": station.lng,
+            "distance_km": round(distance, 1)
+        },
+        "extremes": [
+            {"time": local(t), "type": kind, "height_m": round(height, 2)}
+            for t, height, kind in station.extremes(start, end)
+        ]
+    }
+    if interval_minutes:
+        times = np.arange(start, end, interval_minutes * 60.0)
+        result["series"] = {
+            "start": local(start),
+            "interval_minutes": interval_minutes,
+            "heights_m": np.round(station.heights(times), 3).tolist()
+        }
+    return result
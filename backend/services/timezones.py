@@ -0,0 +1,199 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Optional
+
+from services.cache import TTLCache, env_int
+from services.lazy import lazy_import
+
+
+h3_api = lazy_import("h3.api.numpy_int")
+np = lazy_import("numpy")
+timezonefinder = lazy_import("timezonefinder")
+tz_configs = lazy_import("timezonefinder.configs")
+
+# Border points are snapped to ~10 m before caching the exact answer
+POINT_DECIMALS = 4
+
+BORDER = ""
+
+# Cell index written by build_cell_index(): a header (magic, version, h3
+# resolution, cell count, byte length of the zone names), the zone names
+# NUL-separated and padded to 8 bytes, int64 cell ids in ascending order,
+# then one uint16 zone number per cell (BORDER_ZONE for border cells).
+# Mapped read-only, so every worker process shares the same pages.
+CELL_INDEX_PATH = os.environ.get(
+    "TZ_CELL_INDEX_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "timezone_cells.bin")
+)
+HEADER = struct.Struct("<4sHHII")
+MAGIC = b"TZCL"
+VERSION = 1
+BORDER_ZONE = 0xFFFF
+
+_finder = None
+_finder_lock = threading.Lock()
+
+# Mapped cell index: (cell ids, zone numbers, zone names), False if unavailable
+_index = None
+
+# h3 shortcut cell -> timezone name, or BORDER when several zones share it.
+# Only used when there is no cell index file.
+_cell_zones: "dict[int, str]" = {}
+
+point_cache = TTLCache(
+    "timezone_points",
+    max_entries=env_int("TZ_CACHE_MAX_ENTRIES", 20000),
+    ttl=30 * 24 * 3600,
+)
+
+_stats = {"cell_hits": 0, "exact_lookups": 0}
+
+
+def finder():
+    """The TimezoneFinder, constructed on first use rather than at import."""
+    global _finder
+    if _finder is None:
+        with _finder_lock:
+            if _finder is None:
+                _finder = timezonefinder.TimezoneFinder()
+    return _finder
+
+
+def load_cell_index(path: str = CELL_INDEX_PATH) -> Optional[tuple]:
+    """Memory-map the cell index on first use; None if it's missing or invalid."""
+    global _index
+    if _index is None:
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            _index = False
+            return None
+        magic, version, res, count, names_size = HEADER.unpack_from(data)
+        ids_at = HEADER.size + names_size
+        if (magic != MAGIC or version != VERSION or res != tz_configs.SHORTCUT_H3_RES
+                or len(data) != ids_at + 10 * count):
+            _index = False
+            return None
+        names = data[HEADER.size:ids_at].rstrip(b"\0").decode().split("\0")
+        if sys.byteorder == "little":
+            view = memoryview(data)
+            ids = view[ids_at:ids_at + 8 * count].cast("q")
+            zones = view[ids_at + 8 * count:].cast("H")
+        else:
+            ids, zones = array("q", data[ids_at:ids_at + 8 * count]), array("H", data[ids_at + 8 * count:])
+            ids.byteswap()
+            zones.byteswap()
+        _index = (ids, zones, names)
+    return _index or None
+
+
+def _classify(hex_id: int) -> str:
+    """Zone name if a single zone covers the whole shortcut cell, else BORDER."""
+    tf = finder()
+    polys = tf.shortcut_mapping.get(hex_id)
+    if polys is not None and len(polys):
+        zone_ids = np.unique(tf.zone_ids_of(polys))
+        if len(zone_ids) == 1:
+            return tf.zone_name_from_id(zone_ids[0])
+    return BORDER
+
+
+def _cell_zone(hex_id: int) -> str:
+    index = load_cell_index()
+    if index is not None:
+        ids, zones, names = index
+        i = bisect_left(ids, hex_id)
+        if i < len(ids) and ids[i] == hex_id and zones[i] != BORDER_ZONE:
+            return names[zones[i]]
+        return BORDER
+    zone = _cell_zones.get(hex_id)
+    if zone is None:
+        zone = _cell_zones[hex_id] = _classify(hex_id)
+    return zone
+
+
+def build_cell_index(path: str = CELL_INDEX_PATH) -> int:
+    """Classify every shortcut cell and write the index file; returns the number of cells."""
+    cells = sorted(finder().shortcut_mapping)
+    zones = [_cell_zones[hex_id] if hex_id in _cell_zones else _classify(hex_id) for hex_id in cells]
+    names = sorted({zone for zone in zones if zone})
+    number = {name: i for i, name in enumerate(names)}
+
+    blob = "\0".join(names).encode()
+    blob += b"\0" * (-len(blob) % 8 or 8)
+    header = HEADER.pack(MAGIC, VERSION, tz_configs.SHORTCUT_H3_RES, len(cells), len(blob))
+    ids = np.asarray(cells, dtype="<i8")
+    zone_numbers = np.asarray([number.get(zone, BORDER_ZONE) for zone in zones], dtype="<u2")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header + blob + ids.tobytes() + zone_numbers.tobytes())
+    os.replace(tmp, path)
+    return len(cells)
+
+
+def warm_timezone_index() -> int:
+    """Make every interior-cell lookup fast.
+
+    Maps the cell index file when there is one. Otherwise every shortcut
+    cell is classified up front, and the result is written out so later
+    starts and the other workers can map it instead.
+    """
+    global _index
+    index = load_cell_index()
+    if index is not None:
+        return len(index[0])
+    for hex_id in finder().shortcut_mapping:
+        _cell_zone(hex_id)
+    try:
+        build_cell_index()
+    except OSError:
+        # Read-only deploy: keep the in-process index
+        return len(_cell_zones)
+    _index = None
+    index = load_cell_index()
+    if index is None:
+        return len(_cell_zones)
+    _cell_zones.clear()
+    return len(index[0])
+
+
+def timezone_at(lat: float, lng: float) -> str:
+    """Resolve the timezone for coordinates, falling back to "UTC".
+
+    Points in an h3 shortcut cell that lies entirely inside one zone are
+    answered from the cell index; only border cells run the exact
+    point-in-polygon test, whose results are cached per snapped point.
+    """
+    zone = _cell_zone(h3_api.geo_to_h3(lat, lng, tz_configs.SHORTCUT_H3_RES))
+    if zone:
+        _stats["cell_hits"] += 1
+        return zone
+
+    key = (round(lat, POINT_DECIMALS), round(lng, POINT_DECIMALS))
+    zone = point_cache.get(key, None)
+    if zone is None:
+        _stats["exact_lookups"] += 1
+        zone = finder().timezone_at(lat=lat, lng=lng) or "UTC"
+        point_cache.set(key, zone)
+    return zone
+
+
+def timezone_index_stats() -> dict:
+    index = load_cell_index()
+    if index is not None:
+        ids, zones, _ = index
+        cells, border = len(ids), sum(1 for zone in zones if zone == BORDER_ZONE)
+    else:
+        cells, border = len(_cell_zones), sum(1 for zone in _cell_zones.values() if zone == BORDER)
+    return {
+        "cells_indexed": cells,
+        "border_cells": border,
+        "mapped": index is not None,
+        "cell_hits": _stats["cell_hits"],
+        "exact_lookups": _stats["exact_lookups"],
+    }
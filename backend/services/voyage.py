@@ -0,0 +1,210 @@
+from datetime import datetime, timezone as dt_timezone
+import math
+
+import numpy as np
+import pytz
+
+from services.astronomy import ephem
+from services.almanac import SOLAR_BANDS, SUN_RATE, MOON_RATE, BodyTrack, MoonTrack, solve_crossing, solve_transit
+from services.metrics import timed
+from services.prayer_times import calculate_prayer_times_array
+from services.timezones import timezone_at
+
+
+EARTH_RADIUS_NM = 3440.065
+
+# ephem dates count days from 1899-12-31 12:00 UT
+UNIX_EPOCH_EPHEM = 25567.5
+
+MAX_VOYAGE_DAYS = 120
+
+EVENT_KINDS = ("sun", "twilight", "prayer", "moon")
+PRAYERS = ("fajr", "dhuhr", "asr", "maghrib", "isha")
+
+# Outer iterations of each solver against the moving observer; a vessel
+# covers well under a degree of longitude in the correction, so a couple of
+# rounds converge to the minute.
+OBSERVER_ROUNDS = 4
+
+
+def _to_ephem(t: float) -> float:
+    return t / 86400.0 + UNIX_EPOCH_EPHEM
+
+
+def _from_ephem(t: float) -> float:
+    return (t - UNIX_EPOCH_EPHEM) * 86400.0
+
+
+def utc_isoformat(t: float) -> str:
+    return datetime.fromtimestamp(t, tz=dt_timezone.utc).isoformat(timespec="minutes")
+
+
+class VoyageTrack:
+    """A planned route as a piecewise-linear position over time.
+
+    Each waypoint's speed (knots) applies to the leg leaving it. Longitudes
+    are unwrapped along the route so positions and event times stay
+    continuous across the antimeridian. Before departure the vessel is at
+    the first waypoint and after arrival at the last.
+    """
+
+    def __init__(self, waypoints: list, departure: datetime):
+        if departure.tzinfo is None:
+            departure = departure.replace(tzinfo=dt_timezone.utc)
+        lats = np.array([lat for lat, _, _ in waypoints], dtype=float)
+        lngs = np.array([lng for _, lng, _ in waypoints], dtype=float)
+        speeds = np.array([speed for _, _, speed in waypoints[:-1]], dtype=float)
+        # Each leg goes the short way round
+        lngs[1:] = lngs[0] + np.cumsum((np.diff(lngs) + 180) % 360 - 180)
+
+        phi = np.radians(lats)
+        dphi = np.diff(phi)
+        dlmb = np.radians(np.diff(lngs))
+        a = np.sin(dphi / 2) ** 2 + np.cos(phi[:-1]) * np.cos(phi[1:]) * np.sin(dlmb / 2) ** 2
+        legs_nm = 2 * EARTH_RADIUS_NM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+        self.lats = lats
+        self.lngs = lngs
+        self.times = departure.timestamp() + np.concatenate(([0.0], np.cumsum(legs_nm / speeds * 3600)))
+        self.distance_nm = float(legs_nm.sum())
+
+    @property
+    def departure(self) -> float:
+        return float(self.times[0])
+
+    @property
+    def arrival(self) -> float:
+        return float(self.times[-1])
+
+    @property
+    def days(self) -> float:
+        return (self.arrival - self.departure) / 86400
+
+    def position(self, t):
+        """Latitude and unwrapped longitude in degrees at Unix time(s) ``t``."""
+        return np.interp(t, self.times, self.lats), np.interp(t, self.times, self.lngs)
+
+    def solar_days(self) -> np.ndarray:
+        """Unix midnights of every UTC day whose local noon can fall on the voyage.
+
+        Local noon is near ``day + 12h - lng/15``, so the range is widened by
+        the longitudes the route spans.
+        """
+        first = math.floor((self.departure + self.lngs.min() * 240) / 86400) - 1
+        last = math.ceil((self.arrival + self.lngs.max() * 240) / 86400) + 1
+        return np.arange(first, last + 1, dtype=np.int64) * 86400
+
+
+def _moving(solve, track: VoyageTrack, t: float):
+    """Run a fixed-observer solver (ephem dates, radians) against the position at each estimate."""
+    for _ in range(OBSERVER_ROUNDS):
+        lat, lng = track.position(_from_ephem(t))
+        solved = solve(t, math.radians(float(lat)), math.radians(float(lng)))
+        if solved is None:
+            return None
+        converged = abs(solved - t) < 2 / 86400
+        t = solved
+        if converged:
+            break
+    return t
+
+
+def _sun_events(track: VoyageTrack, days: np.ndarray, kinds: set) -> list:
+    t0 = _to_ephem(track.departure) - 3
+    sun_track = BodyTrack(ephem.Sun(), t0, int(track.days) + 8)
+    bands = [(name, math.radians(horizon)) for name, horizon in SOLAR_BANDS
+             if ("sun" if name == "sun" else "twilight") in kinds]
+    events = []
+    for day in days.tolist():
+        _, lng = track.position(day + 43200)
+        noon = _moving(lambda t, lat, lam: solve_transit(sun_track, t, lat, lam, SUN_RATE),
+                       track, _to_ephem(day + 43200 - float(lng) * 240))
+        for name, h0 in bands:
+            names = ("sunrise", "sunset") if name == "sun" else (f"{name}_dawn", f"{name}_dusk")
+            for direction, event in zip((-1, 1), names):
+                t = _moving(lambda t, lat, lam: solve_crossing(sun_track, t, lat, lam, SUN_RATE, direction, h0),
+                            track, noon)
+                if t is not None:
+                    events.append((_from_ephem(t), event, "sun" if name == "sun" else "twilight"))
+    return events
+
+
+def _moon_events(track: VoyageTrack) -> list:
+    t0 = _to_ephem(track.departure) - 3
+    moon_track = MoonTrack(ephem.Moon(), t0, int(track.days) + 8)
+    period = 2 * math.pi / MOON_RATE
+    transits = []
+    guess = _to_ephem(track.departure) - 1
+    while guess < _to_ephem(track.arrival) + 1:
+        t = _moving(lambda t, lat, lam: solve_transit(moon_track, t, lat, lam, MOON_RATE), track, guess)
+        # Neighbouring guesses can settle on the same transit
+        if not transits or t - transits[-1] > period / 2:
+            transits.append(t)
+        guess = max(guess, t) + period
+    events = []
+    for transit in transits:
+        for direction, name in ((-1, "moonrise"), (1, "moonset")):
+            t = _moving(lambda t, lat, lam: solve_crossing(moon_track, t, lat, lam, MOON_RATE, direction),
+                        track, transit)
+            if t is not None:
+                events.append((_from_ephem(t), name, "moon"))
+    return events
+
+
+def _prayer_events(track: VoyageTrack, days: np.ndarray, method: str) -> list:
+    """Prayer times along the track from the vectorized engine, one solar day per element."""
+    events = []
+    for name in PRAYERS:
+        t = days + 43200.0
+        times = np.full(len(days), np.nan)
+        for _ in range(OBSERVER_ROUNDS):
+            lat, lng = track.position(t)
+            # Evaluate the sun on the event's own UTC date, but keep the
+            # hours relative to the solar day so times stay continuous
+            event_day = np.floor(t / 86400) * 86400
+            offsets = (days - event_day) / 3600
+            hours = calculate_prayer_times_array(lat, lng, event_day.astype(np.int64).astype("datetime64[s]"), offsets, method)[name]
+            times = event_day + hours * 3600
+            t = np.where(np.isnan(times), t, times)
+        events.extend((float(t), name, "prayer") for t in times[~np.isnan(times)].tolist())
+    return events
+
+
+@timed("voyage")
+def calculate_voyage(track: VoyageTrack, kinds=EVENT_KINDS, prayer_method: str = "muslim_world_league") -> list:
+    """Time-ordered sun, twilight, prayer and moon events seen from the moving vessel.
+
+    Every event is solved against the position the vessel will be at when
+    it happens: each fixed-observer solver from the almanac and prayer
+    engines is re-run with the interpolated position at its latest
+    estimate until the time settles.
+    """
+    kinds = set(kinds)
+    days = track.solar_days()
+    events = []
+    if kinds & {"sun", "twilight"}:
+        events.extend(_sun_events(track, days, kinds))
+    if "prayer" in kinds:
+        events.extend(_prayer_events(track, days, prayer_method))
+    if "moon" in kinds:
+        events.extend(_moon_events(track))
+
+    events = sorted(e for e in events if track.departure <= e[0] <= track.arrival)
+    if not events:
+        return []
+    lats, lngs = track.position(np.array([t for t, _, _ in events]))
+    lngs = (lngs + 180) % 360 - 180
+    timeline = []
+    for (t, name, kind), lat, lng in zip(events, lats.tolist(), lngs.tolist()):
+        zone = timezone_at(lat, lng)
+        utc = datetime.fromtimestamp(t, tz=dt_timezone.utc)
+        timeline.append({
+            "time": utc.isoformat(timespec="minutes"),
+            "local_time": utc.astimezone(pytz.timezone(zone)).isoformat(timespec="minutes"),
+            "timezone": zone,
+            "event": name,
+            "kind": kind,
+            "lat": round(lat, 4),
+            "lng": round(lng, 4),
+        })
+    return timeline
@@ -1,6 +1,185 @@
-import httpx
+import asyncio
+import math
+import os
+import random
+import time
 from typing import Optional
 
+from services.cache import TTLCache, MISSING, env_float, env_int
+from services.lazy import lazy_import
+from services.metrics import record_stage, upstream_responses
+from services.singleflight import SingleFlight
+
+
+# Overridable so tests and benchmarks can point at a local stub server
+MARINE_URL = os.environ.get("OPEN_METEO_MARINE_URL", "https://marine-api.open-meteo.com/v1/marine")
+FORECAST_URL = os.environ.get("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+
+# Imported when the first client is created, not at app import
+httpx = lazy_import("httpx")
+
+# Per-call (connect, read, write, pool) timeouts: fail fast on connect,
+# allow a little longer for the body
+MARINE_TIMEOUT = (2.0, 4.0, 4.0, 4.0)
+FORECAST_TIMEOUT = (2.0, 4.0, 4.0, 4.0)
+
+_client: "Optional[httpx.AsyncClient]" = None
+
+# Open-Meteo "current" values are refreshed every 15 minutes on a coarse
+# model grid, so nearby requests within the same slot share one answer.
+WEATHER_GRID_DEG = env_float("WEATHER_GRID_DEG", 0.1)
+WEATHER_SLOT_S = 900
+
+# Forecast runs land every few hours; refetch a cell's forecast at most once an hour
+FORECAST_SLOT_S = 3600
+
+weather_cache = TTLCache(
+    "weather",
+    max_entries=env_int("WEATHER_CACHE_MAX_ENTRIES", 4096),
+    ttl=env_float("WEATHER_CACHE_TTL", WEATHER_SLOT_S),
+    max_bytes=env_int("WEATHER_CACHE_MAX_BYTES", 8 * 1024 * 1024),
+)
+weather_flight = SingleFlight("weather")
+
+# Entries outlive their slot by this long so a cell can be served stale
+# while its refresh for the new slot is in flight.
+WEATHER_STALE_S = env_float("WEATHER_STALE_S", WEATHER_SLOT_S)
+
+# Background refresh of the most requested cells at each slot rollover
+WEATHER_HOT_MAX_CELLS = env_int("WEATHER_HOT_MAX_CELLS", 512)
+WEATHER_REFRESH_TOP = env_int("WEATHER_REFRESH_TOP", 128)
+WEATHER_REFRESH_CONCURRENCY = env_int("WEATHER_REFRESH_CONCURRENCY", 4)
+WEATHER_REFRESH_JITTER_S = env_float("WEATHER_REFRESH_JITTER_S", 30.0)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+async def start_client() -> "httpx.AsyncClient":
+    """Create the shared keep-alive client used for all upstream calls."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_http2_available(),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0),
+            timeout=httpx.Timeout(10.0),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client on application shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_client() -> "httpx.AsyncClient":
+    """Return the shared client, creating it if the lifespan hook has not run."""
+    if _client is None or _client.is_closed:
+        return await start_client()
+    return _client
+
+
+class HotCells:
+    """Decaying request counts per grid cell, capped at ``max_cells`` entries."""
+
+    def __init__(self, max_cells: int):
+        self.max_cells = max_cells
+        self._counts: "dict[tuple, float]" = {}
+
+    def record(self, cell: tuple) -> None:
+        count = self._counts.get(cell)
+        if count is None and len(self._counts) >= self.max_cells:
+            # Make room by dropping the coldest cell
+            del self._counts[min(self._counts, key=self._counts.get)]
+        self._counts[cell] = (count or 0.0) + 1.0
+
+    def top(self, n: int) -> list:
+        return sorted(self._counts, key=self._counts.get, reverse=True)[:n]
+
+    def decay(self) -> None:
+        """Halve every count so cells that stop being requested age out."""
+        self._counts = {cell: count / 2 for cell, count in self._counts.items() if count > 0.5}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+hot_cells = HotCells(WEATHER_HOT_MAX_CELLS)
+
+_refresher: Optional[asyncio.Task] = None
+_background: "set[asyncio.Task]" = set()
+_refresh_stats = {"cycles": 0, "refreshed": 0, "stale_served": 0}
+
+
+def _refresh_in_background(key: tuple) -> None:
+    task = asyncio.ensure_future(weather_flight.do(key, _fetch_and_cache, key))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def refresh_hot_cells(slot: int) -> int:
+    """Fetch the hottest cells for ``slot`` that aren't cached yet; returns how many were fetched."""
+    semaphore = asyncio.Semaphore(WEATHER_REFRESH_CONCURRENCY)
+    keys = [(*cell, slot) for cell in hot_cells.top(WEATHER_REFRESH_TOP)]
+    keys = [key for key in keys if weather_cache.get(key) is MISSING]
+
+    async def refresh(key: tuple) -> None:
+        # Spread the cycle over the jitter window instead of bursting upstream
+        await asyncio.sleep(random.uniform(0, WEATHER_REFRESH_JITTER_S))
+        async with semaphore:
+            await weather_flight.do(key, _fetch_and_cache, key)
+
+    await asyncio.gather(*(refresh(key) for key in keys), return_exceptions=True)
+    hot_cells.decay()
+    _refresh_stats["cycles"] += 1
+    _refresh_stats["refreshed"] += len(keys)
+    return len(keys)
+
+
+async def _refresh_loop() -> None:
+    while True:
+        # Wake shortly after each slot rollover, when upstream has new values
+        slot = model_slot() + 1
+        delay = slot * WEATHER_SLOT_S - time.time() + random.uniform(1.0, 1.0 + WEATHER_REFRESH_JITTER_S)
+        await asyncio.sleep(max(0.0, delay))
+        await refresh_hot_cells(slot)
+
+
+def start_refresher() -> None:
+    """Start the background refresher for hot weather cells."""
+    global _refresher
+    if _refresher is None or _refresher.done():
+        _refresher = asyncio.ensure_future(_refresh_loop())
+
+
+async def stop_refresher() -> None:
+    global _refresher
+    tasks = list(_background)
+    if _refresher is not None:
+        tasks.append(_refresher)
+        _refresher = None
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def refresher_stats() -> dict:
+    return {
+        "running": _refresher is not None and not _refresher.done(),
+        "tracked_cells": len(hot_cells),
+        "in_flight": len(_background),
+        **_refresh_stats,
+    }
+
 
 def degrees_to_direction(degrees: float) -> str:
     """Convert wind direction in degrees to compass direction."""
@@ -13,42 +192,128 @@ def degrees_to_direction(degrees: float) -> str:
     return directions[idx]
 
 
-async def fetch_marine_weather(lat: float, lng: float) -> dict:
-    """Fetch marine weather data from Open-Meteo APIs."""
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        # Fetch marine data (waves, swell)
-        marine_params = {
-            "latitude": lat,
-            "longitude": lng,
-            "current": "wave_height,wave_period,wave_direction,swell_wave_height,swell_wave_period,swell_wave_direction"
-        }
-
-        # Fetch weather data (wind, temp, visibility)
-        weather_params = {
-            "latitude": lat,
-            "longitude": lng,
-            "current": "temperature_2m,visibility,wind_speed_10m,wind_direction_10m,wind_gusts_10m"
-        }
-
-        try:
-            marine_response = await client.get(
-                "https://marine-api.open-meteo.com/v1/marine",
-                params=marine_params
-            )
-            marine_data = marine_response.json() if marine_response.status_code == 200 else {}
-        except Exception:
-            marine_data = {}
-
-        try:
-            weather_response = await client.get(
-                "https://api.open-meteo.com/v1/forecast",
-                params=weather_params
-            )
-            weather_data = weather_response.json() if weather_response.status_code == 200 else {}
-        except Exception:
-            weather_data = {}
+async def _get_json(client: "httpx.AsyncClient", url: str, params: dict, timeout: tuple) -> dict:
+    """GET a JSON document, returning an empty dict on any failure."""
+    api = url.rstrip("/").rsplit("/", 1)[-1]
+    status = "error"
+    started = time.perf_counter()
+    try:
+        response = await client.get(url, params=params, timeout=timeout)
+        status = str(response.status_code)
+        return response.json() if response.status_code == 200 else {}
+    except httpx.TimeoutException:
+        status = "timeout"
+        return {}
+    except Exception:
+        return {}
+    finally:
+        upstream_responses.inc(api, status)
+        record_stage(f"upstream_{api}", time.perf_counter() - started)
+
+
+def snap_to_grid(lat: float, lng: float, step: float = WEATHER_GRID_DEG) -> tuple:
+    """Snap coordinates to the centre of their upstream model grid cell."""
+    snapped_lat = (math.floor(lat / step) + 0.5) * step
+    snapped_lng = (math.floor(lng / step) + 0.5) * step
+    return round(min(max(snapped_lat, -90.0), 90.0), 4), round(((snapped_lng + 180) % 360) - 180, 4)
+
+
+def model_slot(now: Optional[float] = None) -> int:
+    """Index of the upstream 15-minute update slot containing ``now``."""
+    return int((time.time() if now is None else now) // WEATHER_SLOT_S)
+
+
+def weather_cache_key(lat: float, lng: float) -> tuple:
+    return (*snap_to_grid(lat, lng), model_slot())
+
+
+def weather_version(lat: float, lng: float, current: bool) -> tuple:
+    """Grid cell and upstream update slot a weather answer for (lat, lng) comes from."""
+    if current:
+        return ("current", *snap_to_grid(lat, lng), model_slot())
+    return ("forecast", *snap_to_grid(lat, lng), int(time.time() // FORECAST_SLOT_S))
+
+
+async def fetch_open_meteo_current(lat: float, lng: float) -> Optional[dict]:
+    """Fetch current marine weather for the grid cell containing (lat, lng), using the cache.
+
+    None if the forecast API call failed and nothing is cached for the cell.
+    """
+    key = weather_cache_key(lat, lng)
+    cell_lat, cell_lng, slot = key
+    hot_cells.record((cell_lat, cell_lng))
+    cached = weather_cache.get(key)
+    if cached is not MISSING:
+        return cached
+
+    # Serve last slot's value straight away and refresh behind it
+    stale = weather_cache.get((cell_lat, cell_lng, slot - 1))
+    if stale is not MISSING:
+        _refresh_stats["stale_served"] += 1
+        _refresh_in_background(key)
+        return stale
+    return await weather_flight.do(key, _fetch_and_cache, key)
+
+
+def cached_open_meteo_current(lat: float, lng: float) -> Optional[tuple]:
+    """(weather, fresh) that fetch_open_meteo_current would answer from the cache right now.
+
+    ``fresh`` is False when last slot's value would be served stale. None
+    if answering would need an upstream fetch. Nothing is fetched or counted.
+    """
+    cell_lat, cell_lng, slot = weather_cache_key(lat, lng)
+    cached = weather_cache.peek((cell_lat, cell_lng, slot))
+    if cached is not MISSING:
+        return cached, True
+    stale = weather_cache.peek((cell_lat, cell_lng, slot - 1))
+    if stale is not MISSING:
+        return stale, False
+    return None
+
+
+async def _fetch_and_cache(key: tuple) -> Optional[dict]:
+    cell_lat, cell_lng, slot = key
+    marine_data, weather_data = await fetch_upstream(cell_lat, cell_lng)
+    # A failed forecast call is reported as unavailable, not as calm
+    # defaults. Marine data is legitimately missing over land, so an empty
+    # marine document still makes a cacheable answer.
+    if not weather_data.get("current"):
+        return None
+    weather = build_weather(marine_data, weather_data)
+    ttl = (slot + 1) * WEATHER_SLOT_S - time.time()
+    ttl = max(1.0, min(ttl, weather_cache.ttl)) + WEATHER_STALE_S
+    weather_cache.set(key, weather, ttl=ttl)
+    return weather
+
+
+async def fetch_upstream(lat: float, lng: float) -> tuple:
+    """Fetch the raw marine and forecast documents from Open-Meteo APIs."""
+
+    # Fetch marine data (waves, swell)
+    marine_params = {
+        "latitude": lat,
+        "longitude": lng,
+        "current": "wave_height,wave_period,wave_direction,swell_wave_height,swell_wave_period,swell_wave_direction"
+    }
+
+    # Fetch weather data (wind, temp, visibility)
+    weather_params = {
+        "latitude": lat,
+        "longitude": lng,
+        "current": "temperature_2m,visibility,wind_speed_10m,wind_direction_10m,wind_gusts_10m",
+        "wind_speed_unit": "ms"
+    }
+
+    client = await get_client()
+    marine_data, weather_data = await asyncio.gather(
+        _get_json(client, MARINE_URL, marine_params, MARINE_TIMEOUT),
+        _get_json(client, FORECAST_URL, weather_params, FORECAST_TIMEOUT),
+    )
+    return marine_data, weather_data
+
 
+def build_weather(marine_data: dict, weather_data: dict) -> dict:
+    """Shape the raw Open-Meteo documents into the API weather section."""
     # Extract current weather
     current_weather = weather_data.get("current", {})
     current_marine = marine_data.get("current", {})
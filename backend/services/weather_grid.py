@@ -0,0 +1,155 @@
+import mmap
+import os
+import struct
+from typing import Optional
+
+import numpy as np
+
+from services.forecast import DIRECTIONS, HOURLY_MARINE, HOURLY_WEATHER, HourlyForecast
+
+
+# Gridded forecast file written by write_grid(): a header describing a
+# regular lat/lng/time grid, the variable names, then float32 values laid
+# out as [lat][lng][time][variable] so the corners of a point query and a
+# cell's whole time series are contiguous. Mapped read-only, so every
+# worker process shares the same pages.
+GRID_PATH = os.environ.get(
+    "WEATHER_GRID_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "weather_grid.bin")
+)
+HEADER = struct.Struct("<4sHHIII ddddqq")
+MAGIC = b"WGRD"
+VERSION = 1
+NAME_SIZE = 32
+DATA_ALIGN = 64
+
+VARIABLES = HOURLY_WEATHER + HOURLY_MARINE
+
+
+def write_grid(path: str, lat0: float, dlat: float, lng0: float, dlng: float,
+               t0: int, dt: int, fields: dict) -> None:
+    """Write a grid file from ``{variable: array[lat, lng, time]}`` on a regular grid."""
+    shape = next(iter(fields.values())).shape
+    names = [name for name in VARIABLES if name in fields]
+    header = HEADER.pack(MAGIC, VERSION, len(names), *shape, lat0, dlat, lng0, dlng, t0, dt)
+    header += b"".join(name.encode().ljust(NAME_SIZE, b"\0") for name in names)
+    header += b"\0" * (-len(header) % DATA_ALIGN)
+    data = np.stack([np.asarray(fields[name], dtype="<f4") for name in names], axis=-1)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(np.ascontiguousarray(data).tobytes())
+    os.replace(tmp, path)
+
+
+def ingest_npz(source: str, path: str = GRID_PATH) -> tuple:
+    """Convert a bulk ``.npz`` (lats, lngs, times and one [lat, lng, time] array per variable)."""
+    bulk = np.load(source)
+    lats, lngs, times = bulk["lats"], bulk["lngs"], bulk["times"].astype(np.int64)
+    for axis in (lats, lngs, times):
+        if len(axis) < 2 or axis[1] <= axis[0] or not np.allclose(np.diff(axis), axis[1] - axis[0]):
+            raise ValueError("lats, lngs and times must be regular ascending axes")
+    fields = {name: bulk[name] for name in VARIABLES if name in bulk.files}
+    if not fields:
+        raise ValueError("no known variables in " + source)
+    write_grid(path, float(lats[0]), float(lats[1] - lats[0]), float(lngs[0]), float(lngs[1] - lngs[0]),
+               int(times[0]), int(times[1] - times[0]), fields)
+    return len(lats), len(lngs), len(times), sorted(fields)
+
+
+class WeatherGrid:
+    """Read-only view of a grid file with bilinear (space) and linear (time) interpolation."""
+
+    def __init__(self, path: str = GRID_PATH):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, n_vars, self.n_lat, self.n_lng, self.n_time,
+         self.lat0, self.dlat, self.lng0, self.dlng, self.t0, self.dt) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a weather grid file")
+        offset = HEADER.size
+        self.names = [
+            self._map[offset + i * NAME_SIZE:offset + (i + 1) * NAME_SIZE].rstrip(b"\0").decode()
+            for i in range(n_vars)
+        ]
+        offset += n_vars * NAME_SIZE
+        offset += -offset % DATA_ALIGN
+        self.data = np.frombuffer(self._map, dtype="<f4", offset=offset,
+                                  count=self.n_lat * self.n_lng * self.n_time * n_vars
+                                  ).reshape(self.n_lat, self.n_lng, self.n_time, n_vars)
+        self.times = self.t0 + self.dt * np.arange(self.n_time, dtype=np.int64)
+        self._direction_index = [n for n, name in enumerate(self.names) if name in DIRECTIONS]
+        # A grid spanning the globe in longitude wraps at the antimeridian
+        self._wraps = self.n_lng * self.dlng >= 360 - 1e-9
+
+    def _corners(self, lat: float, lng: float) -> Optional[tuple]:
+        """Row/column indices and bilinear weights of the four surrounding grid points."""
+        y = (lat - self.lat0) / self.dlat
+        x = ((lng - self.lng0) % 360) / self.dlng if self._wraps else (lng - self.lng0) / self.dlng
+        if not (0 <= y <= self.n_lat - 1) or not (0 <= x <= (self.n_lng if self._wraps else self.n_lng - 1)):
+            return None
+        i = min(int(y), self.n_lat - 2)
+        j = min(int(x), self.n_lng - (1 if self._wraps else 2))
+        wy, wx = y - i, x - j
+        rows = [i, i + 1]
+        cols = [j, (j + 1) % self.n_lng]
+        weights = np.array([[(1 - wy) * (1 - wx), (1 - wy) * wx], [wy * (1 - wx), wy * wx]])
+        return rows, cols, weights
+
+    def _blend(self, block: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Weighted mean over the leading axes of ``block`` covered by ``weights``, skipping NaNs.
+
+        Directions are averaged as unit vectors so 350 and 10 degrees blend to north.
+        """
+        n = weights.size
+        out_shape = block.shape[weights.ndim:]
+        values = block.reshape(n, -1, block.shape[-1])
+        w = weights.reshape(n)
+        dirs = self._direction_index
+        nan = np.isnan(values)
+        if not nan.any():
+            mean = (w @ values.reshape(n, -1)).reshape(values.shape[1:])
+            if len(dirs):
+                rad = np.radians(values[..., dirs]).reshape(n, -1)
+                u, v = w @ np.sin(rad), w @ np.cos(rad)
+                mean[..., dirs] = (np.degrees(np.arctan2(u, v)) % 360).reshape(mean[..., dirs].shape)
+            return mean.reshape(out_shape)
+
+        # Land points have no marine values: renormalise over the valid corners
+        wv = np.where(nan, 0.0, w[:, None, None])
+        values = np.where(nan, 0.0, values)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = (wv * values).sum(axis=0) / wv.sum(axis=0)
+        if len(dirs):
+            rad = np.radians(values[..., dirs])
+            u, v = (wv[..., dirs] * np.sin(rad)).sum(axis=0), (wv[..., dirs] * np.cos(rad)).sum(axis=0)
+            mean[..., dirs] = np.where(np.isnan(mean[..., dirs]), np.nan, np.degrees(np.arctan2(u, v)) % 360)
+        return mean.reshape(out_shape)
+
+    def at(self, lat: float, lng: float, t: float) -> Optional[dict]:
+        """Variables at a point and Unix time, or None outside the grid."""
+        corners = self._corners(lat, lng)
+        k = (t - self.t0) / self.dt
+        if corners is None or not 0 <= k <= self.n_time - 1:
+            return None
+        (i, _), (j, j1), weights = corners
+        k0 = min(int(k), self.n_time - 2)
+        wk = k - k0
+        if j1 == j + 1:
+            block = self.data[i:i + 2, j:j + 2, k0:k0 + 2]
+        else:
+            block = self.data[i:i + 2][:, [j, j1], k0:k0 + 2]
+        values = self._blend(block, np.multiply.outer(weights, (1 - wk, wk)))
+        return {name: value for name, value in zip(self.names, values.tolist()) if value == value}
+
+    def forecast(self, lat: float, lng: float) -> Optional[HourlyForecast]:
+        """The point's whole time series as an HourlyForecast, or None outside the grid."""
+        corners = self._corners(lat, lng)
+        if corners is None:
+            return None
+        rows, cols, weights = corners
+        series = self._blend(self.data[np.ix_(rows, cols)], weights).astype(np.float32)
+        return HourlyForecast(self.times, {name: series[:, n] for n, name in enumerate(self.names)})
+
+    def close(self) -> None:
+        self.data = None
+        self._map.close()
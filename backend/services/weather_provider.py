@@ -0,0 +1,153 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from services.forecast import HourlyForecast, cached_open_meteo_forecast, fetch_open_meteo_forecast, shape_weather
+from services.weather_client import (
+    cached_open_meteo_current,
+    fetch_open_meteo_current,
+    start_refresher,
+    stop_refresher,
+    refresher_stats
+)
+from services.weather_grid import GRID_PATH, WeatherGrid
+
+
+# "open-meteo" calls the public APIs per grid cell; "grid" answers from a
+# local gridded forecast file with no network I/O at all.
+WEATHER_PROVIDER = os.environ.get("WEATHER_PROVIDER", "open-meteo").lower()
+
+
+class WeatherProvider(ABC):
+    """Source of current conditions and hourly forecasts for a point."""
+
+    name = ""
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def current(self, lat: float, lng: float) -> Optional[dict]:
+        """Current weather section, or None where the provider has no data or upstream failed."""
+
+    @abstractmethod
+    async def forecast(self, lat: float, lng: float) -> Optional[HourlyForecast]:
+        """Hourly forecast, or None where the provider has no data."""
+
+    def cached_current(self, lat: float, lng: float) -> Optional[tuple]:
+        """(weather, fresh) current() would answer without I/O, or None if it needs a fetch."""
+        return None
+
+    def cached_forecast(self, lat: float, lng: float) -> Optional[HourlyForecast]:
+        """The forecast forecast() would answer without I/O, or None if it needs a fetch."""
+        return None
+
+    def stats(self) -> dict:
+        return {"name": self.name}
+
+
+class OpenMeteoProvider(WeatherProvider):
+    name = "open-meteo"
+
+    async def start(self) -> None:
+        # Keep the most requested weather cells fresh across slot rollovers
+        start_refresher()
+
+    async def stop(self) -> None:
+        await stop_refresher()
+
+    async def current(self, lat: float, lng: float) -> Optional[dict]:
+        return await fetch_open_meteo_current(lat, lng)
+
+    async def forecast(self, lat: float, lng: float) -> Optional[HourlyForecast]:
+        return await fetch_open_meteo_forecast(lat, lng)
+
+    def cached_current(self, lat: float, lng: float) -> Optional[tuple]:
+        return cached_open_meteo_current(lat, lng)
+
+    def cached_forecast(self, lat: float, lng: float) -> Optional[HourlyForecast]:
+        return cached_open_meteo_forecast(lat, lng)
+
+    def stats(self) -> dict:
+        return {"name": self.name, "refresher": refresher_stats()}
+
+
+class GriddedProvider(WeatherProvider):
+    """Point queries interpolated from a memory-mapped gridded forecast file."""
+
+    name = "grid"
+
+    def __init__(self, path: str = GRID_PATH):
+        self.path = path
+        self.grid: Optional[WeatherGrid] = None
+
+    def _grid(self) -> WeatherGrid:
+        if self.grid is None:
+            self.grid = WeatherGrid(self.path)
+        return self.grid
+
+    async def start(self) -> None:
+        self._grid()
+
+    async def stop(self) -> None:
+        if self.grid is not None:
+            self.grid.close()
+            self.grid = None
+
+    async def current(self, lat: float, lng: float) -> Optional[dict]:
+        # Outside the grid's area or time range there is nothing to report
+        values = self._grid().at(lat, lng, time.time())
+        return shape_weather(values) if values else None
+
+    async def forecast(self, lat: float, lng: float) -> Optional[HourlyForecast]:
+        return self._grid().forecast(lat, lng)
+
+    # The file is always at hand, so answering is never more than a lookup
+    def cached_current(self, lat: float, lng: float) -> Optional[tuple]:
+        values = self._grid().at(lat, lng, time.time())
+        return (shape_weather(values), True) if values else None
+
+    def cached_forecast(self, lat: float, lng: float) -> Optional[HourlyForecast]:
+        return self._grid().forecast(lat, lng)
+
+    def stats(self) -> dict:
+        grid = self._grid()
+        return {
+            "name": self.name,
+            "path": os.path.normpath(self.path),
+            "shape": [grid.n_lat, grid.n_lng, grid.n_time, len(grid.names)],
+            "start": int(grid.times[0]),
+            "end": int(grid.times[-1]),
+        }
+
+
+PROVIDERS = {provider.name: provider for provider in (OpenMeteoProvider, GriddedProvider)}
+
+_provider: Optional[WeatherProvider] = None
+
+
+def get_provider() -> WeatherProvider:
+    """The configured provider, created on first use."""
+    global _provider
+    if _provider is None:
+        _provider = PROVIDERS[WEATHER_PROVIDER]()
+    return _provider
+
+
+def set_provider(provider: WeatherProvider) -> None:
+    global _provider
+    _provider = provider
+
+
+async def fetch_marine_weather(lat: float, lng: float) -> Optional[dict]:
+    """Current marine weather for (lat, lng) from the configured provider; None if unavailable."""
+    return await get_provider().current(lat, lng)
+
+
+async def fetch_forecast(lat: float, lng: float) -> Optional[HourlyForecast]:
+    """Hourly forecast for (lat, lng) from the configured provider."""
+    return await get_provider().forecast(lat, lng)
@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("numpy")
+pytest.importorskip("pytz")
+pytest.importorskip("ephem")
+pytest.importorskip("astral")
+pytest.importorskip("timezonefinder")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from services.forecast import shape_weather  # noqa: E402
+from services.weather_client import weather_cache_key  # noqa: E402
+
+ITEMS = [
+    {"lat": 50.1, "lng": -5.5, "date": "2024-03-20", "timezone": "Europe/London"},
+    {"lat": 50.1001, "lng": -5.5001, "date": "2024-03-20", "timezone": "Europe/London"},
+    {"lat": 50.1, "lng": -5.5, "date": "2024-03-21", "timezone": "Europe/London", "prayer_method": "isna"},
+    {"lat": -33.87, "lng": 151.21, "date": "2024-03-20"},
+    {"lat": 50.1, "lng": -5.5, "date": "2024-03-20", "timezone": "Europe/London"},
+    {"lat": 21.42, "lng": 39.83, "timezone": "Asia/Riyadh", "prayer_method": "umm_al_qura"},
+]
+
+
+class FakeForecast:
+    """Wave height follows the UTC hour, so each item's local noon shows through."""
+
+    def at(self, t):
+        return {"wave_height": round(t / 3600 % 24, 1), "temperature_2m": 15.0}
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = {"current": [], "forecast": []}
+
+    async def current(lat, lng):
+        calls["current"].append(weather_cache_key(lat, lng))
+        return shape_weather({"wave_height": 1.0})
+
+    async def forecast(lat, lng):
+        calls["forecast"].append(weather_cache_key(lat, lng))
+        return FakeForecast()
+
+    monkeypatch.setattr(main, "fetch_marine_weather", current)
+    monkeypatch.setattr(main, "fetch_forecast", forecast)
+    return calls
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
+
+
+def test_batch_matches_single_dashboards(client, fetches):
+    response = client.post("/api/v1/dashboard/batch", json={"items": ITEMS, "mode": "fast"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == len(ITEMS)
+
+    # One weather call per grid cell and kind, however many items share it
+    cells = {weather_cache_key(item["lat"], item["lng"]) for item in ITEMS if "date" in item}
+    assert sorted(fetches["forecast"]) == sorted(cells)
+    assert len(fetches["current"]) == 1
+
+    for item, result in zip(ITEMS, results):
+        params = {"mode": "fast", **item}
+        single = client.get("/api/v1/dashboard", params=params)
+        assert single.status_code == 200
+        assert result == single.json(), item
+
+
+def test_streamed_batch_is_the_same_in_order(client, fetches):
+    body = {"items": ITEMS, "mode": "fast"}
+    batch = client.post("/api/v1/dashboard/batch", json=body).json()["results"]
+    streamed = client.post("/api/v1/dashboard/batch", params={"stream": "true"}, json=body)
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in streamed.text.splitlines()] == batch
@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services import cache as cache_module  # noqa: E402
+from services.cache import MISSING, TTLCache, approx_size  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    cache = TTLCache("test_ttl", ttl=10.0)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30.0)
+
+    clock.now += 9.9
+    assert cache.get("a") == 1
+    clock.now += 0.1
+    assert cache.get("a") is MISSING
+    assert cache.peek("b") == 2
+    clock.now += 20.0
+    assert cache.get("b", None) is None
+
+    stats = cache.stats()
+    assert stats["expirations"] == 2
+    assert stats["entries"] == 0
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_byte_ceiling_evicts_least_recently_used():
+    value = {"wave_height": 1.5, "wind_speed": 12.0}
+    size = approx_size(value)
+    cache = TTLCache("test_bytes", max_entries=100, max_bytes=3 * size)
+    for key in ("a", "b", "c"):
+        cache.set(key, dict(value))
+    cache.get("a")
+    cache.set("d", dict(value))
+
+    assert cache.peek("b") is MISSING
+    assert [cache.peek(key) is not MISSING for key in ("a", "c", "d")] == [True, True, True]
+    stats = cache.stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] == 1
+
+
+def test_entry_count_ceiling_evicts_least_recently_used():
+    cache = TTLCache("test_entries", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.peek("b") is MISSING
+    assert (cache.peek("a"), cache.peek("c")) == (1, 3)
+
+
+def test_replacing_a_key_keeps_the_byte_count_exact():
+    cache = TTLCache("test_replace", max_bytes=10_000)
+    cache.set("a", [1, 2, 3])
+    cache.set("a", "x")
+    assert cache.stats()["bytes"] == approx_size("x")
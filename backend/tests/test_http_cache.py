@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("numpy")
+pytest.importorskip("pytz")
+pytest.importorskip("astral")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from main import app  # noqa: E402
+from services.http_cache import make_etag, weather_cache_control, weather_etag  # noqa: E402
+
+SOLAR = "/api/v1/solar"
+PINNED = {"lat": 50.1, "lng": -5.5, "date": "2024-06-21", "timezone": "Europe/London"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    # No lifespan: the worker pool starts on first use
+    return TestClient(app)
+
+
+def test_pinned_date_is_immutable_and_revalidates_to_304(client):
+    first = client.get(SOLAR, params=PINNED)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert "immutable" in first.headers["cache-control"]
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        again = client.get(SOLAR, params=PINNED, headers={"If-None-Match": header})
+        assert again.status_code == 304, header
+        assert again.content == b""
+        assert again.headers["etag"] == etag
+        assert again.headers["cache-control"] == first.headers["cache-control"]
+
+
+def test_changed_inputs_do_not_match(client):
+    etag = client.get(SOLAR, params=PINNED).headers["etag"]
+    for change in ({"date": "2024-06-22"}, {"timezone": "UTC"}, {"mode": "fast"}, {"lat": 50.2}):
+        response = client.get(SOLAR, params={**PINNED, **change}, headers={"If-None-Match": etag})
+        assert response.status_code == 200, change
+        assert response.headers["etag"] != etag
+
+
+def test_today_is_cached_until_midnight_only(client):
+    params = {key: value for key, value in PINNED.items() if key != "date"}
+    control = client.get(SOLAR, params=params).headers["cache-control"]
+    assert "immutable" not in control
+    assert 0 < int(control.split("max-age=")[1]) <= 24 * 3600
+
+
+def test_weather_tags_follow_the_data_served():
+    fresh = {"wave_height": 1.2, "wind_speed": 10.0}
+    stale = {"wave_height": 1.1, "wind_speed": 9.0}
+    assert weather_etag(fresh) == weather_etag(dict(fresh))
+    assert weather_etag(fresh) != weather_etag(stale)
+    assert weather_etag(fresh) != make_etag("weather", None)
+
+    assert weather_cache_control(None, True, True) == "no-store"
+    assert weather_cache_control(stale, False, True) == "no-cache"
+    assert weather_cache_control(fresh, True, True).startswith("public, max-age=")
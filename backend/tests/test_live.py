@@ -0,0 +1,109 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pytz")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services import live  # noqa: E402
+from services.live import LiveSession, merge_patch  # noqa: E402
+
+
+def apply_patch(target, patch):
+    """MergePatch from RFC 7386, section 2."""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_patch(result.get(key), value)
+    return result
+
+
+def without_nulls(value):
+    if isinstance(value, dict):
+        return {key: without_nulls(v) for key, v in value.items() if v is not None}
+    return value
+
+
+# (original, result) pairs from RFC 7386, appendix A, that a diff can produce
+RFC_EXAMPLES = [
+    ({"a": "b"}, {"a": "c"}),
+    ({"a": "b"}, {"a": "b", "b": "c"}),
+    ({"a": "b"}, {}),
+    ({"a": "b", "b": "c"}, {"b": "c"}),
+    ({"a": ["b"]}, {"a": "c"}),
+    ({"a": "c"}, {"a": ["b"]}),
+    ({"a": {"b": "c"}}, {"a": {"b": "d"}}),
+    ({"a": [{"b": "c"}]}, {"a": [1]}),
+    (["a", "b"], ["c", "d"]),
+    ({"a": "b"}, ["c"]),
+    ({"a": "foo"}, "bar"),
+    ({"e": None}, {"e": None, "a": 1}),
+    ([1, 2], {"a": "b"}),
+    ({}, {"a": {"bb": {}}}),
+]
+
+
+@pytest.mark.parametrize("old,new", RFC_EXAMPLES)
+def test_patch_turns_old_into_new(old, new):
+    patch = merge_patch(old, new)
+    assert patch is not None
+    assert apply_patch(old, patch) == new
+
+
+def test_equal_documents_give_no_patch():
+    doc = {"solar": {"sunrise": "06:01", "sunset": "18:02"}, "weather": {"wave_height": 1.2}, "tags": [1, 2]}
+    assert merge_patch(doc, {**doc, "solar": dict(doc["solar"])}) is None
+
+
+def test_patch_carries_only_the_changes():
+    old = {"solar": {"sunrise": "06:01", "sunset": "18:02"}, "date": "2024-03-20", "gone": 1}
+    new = {"solar": {"sunrise": "06:00", "sunset": "18:02"}, "date": "2024-03-20", "added": [1]}
+    assert merge_patch(old, new) == {"solar": {"sunrise": "06:00"}, "gone": None, "added": [1]}
+
+
+@pytest.mark.parametrize("old_value", [1.5, {"wave_height": 1.2}, [1]])
+def test_value_becoming_null_deletes_the_key(old_value):
+    old, new = {"weather": old_value, "date": "2024-03-20"}, {"weather": None, "date": "2024-03-20"}
+    patch = merge_patch(old, new)
+    assert patch == {"weather": None}
+    assert apply_patch(old, patch) == without_nulls(new)
+
+
+def test_session_clears_weather_when_the_upstream_fails(monkeypatch):
+    answers = iter([{"wave_height": 1.2}, None, {"wave_height": 1.3}])
+    fetches = []
+
+    async def fetch(lat, lng):
+        fetches.append((lat, lng))
+        return next(answers)
+
+    def astronomy(lat, lng, prayer_method, mode):
+        return {"date": "2024-03-20", "timezone": "UTC", "solar": {"sunrise": "06:00"}}
+
+    monkeypatch.setattr(live, "fetch_marine_weather", fetch)
+    monkeypatch.setattr(live, "compute_astronomy", astronomy)
+    monkeypatch.setattr(live, "local_today", lambda timezone: live.date(2024, 3, 20))
+    versions = iter([1, 2, 2])
+    monkeypatch.setattr(live, "weather_version", lambda lat, lng, current: next(versions))
+
+    async def run():
+        session = LiveSession()
+        first = await session.update(10.0, 20.0)
+        second = await session.update(10.0, 20.0)
+        # The failed slot is fetched again on the next fix
+        third = await session.update(10.0, 20.0)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first["weather"] == {"wave_height": 1.2}
+    assert second == {"weather": None}
+    assert third == {"weather": {"wave_height": 1.3}}
+    assert len(fetches) == 3
@@ -0,0 +1,48 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("ephem")
+pytest.importorskip("pytz")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services import astronomy  # noqa: E402
+from services.astronomy import calculate_lunar, calculate_lunar_global, lunar_cache  # noqa: E402
+
+PLACES = [(51.5074, -0.1278, "Europe/London"), (-33.8688, 151.2093, "Australia/Sydney"),
+          (78.2232, 15.6267, "Arctic/Longyearbyen")]
+DATES = [date(2024, 1, 1) + timedelta(days=11 * i) for i in range(40)]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    lunar_cache.clear()
+    yield
+    lunar_cache.clear()
+
+
+def test_cached_answers_match_uncached():
+    first = {(place, d): calculate_lunar(*place, d) for place in PLACES for d in DATES}
+    assert len(lunar_cache) == len(DATES)
+    lunar_cache.clear()
+    for (place, d), expected in first.items():
+        lunar_cache.clear()
+        assert calculate_lunar(*place, d) == expected, (place, d)
+
+
+def test_global_part_is_shared_across_locations():
+    d = date(2024, 8, 19)
+    results = [calculate_lunar(*place, d) for place in PLACES]
+    for key in ("phase", "illumination", "next_full_moon", "next_new_moon"):
+        assert len({result[key] for result in results}) == 1
+    assert lunar_cache.stats()["hits"] >= len(PLACES) - 1
+
+
+def test_lunation_table_matches_the_ephem_fallback(monkeypatch):
+    from_table = [calculate_lunar_global(d) for d in DATES]
+    lunar_cache.clear()
+    monkeypatch.setattr(astronomy, "next_phase_date", lambda target_date, phase: None)
+    assert [calculate_lunar_global(d) for d in DATES] == from_table
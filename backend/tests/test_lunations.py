@@ -0,0 +1,74 @@
+import os
+import random
+import sys
+from datetime import date, datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.lunations import (  # noqa: E402
+    FIRST_QUARTER, FULL_MOON, LAST_QUARTER, NEW_MOON, load_table, lunation_fraction, next_phase, next_phase_date,
+    to_epoch,
+)
+
+pytestmark = pytest.mark.skipif(load_table() is None, reason="data/lunations.bin not generated")
+
+SYNODIC_MONTH_S = 29.530589 * 86400
+
+
+def random_instants(n, seed):
+    rng = random.Random(seed)
+    start, end = to_epoch(date(1901, 1, 1)), to_epoch(date(2099, 12, 1))
+    return [rng.uniform(start, end) for _ in range(n)]
+
+
+def test_table_is_ordered_and_phases_a_quarter_apart():
+    table = load_table()
+    assert all(a < b for a, b in zip(table, table[1:]))
+    gaps = [b - a for a, b in zip(table, table[1:])]
+    assert min(gaps) > 6 * 86400 and max(gaps) < 9 * 86400
+
+
+@pytest.mark.parametrize("phase", [NEW_MOON, FIRST_QUARTER, FULL_MOON, LAST_QUARTER])
+def test_next_phase_is_the_first_one_after(phase):
+    for t in random_instants(500, seed=phase):
+        found = next_phase(t, phase)
+        assert t < found <= t + SYNODIC_MONTH_S + 86400
+        # The same phase one lunation earlier is already past
+        assert next_phase(found - SYNODIC_MONTH_S / 2, phase) == found
+
+
+@pytest.mark.parametrize("phase,next_name", [(NEW_MOON, "next_new_moon"), (FULL_MOON, "next_full_moon"),
+                                             (FIRST_QUARTER, "next_first_quarter_moon"),
+                                             (LAST_QUARTER, "next_last_quarter_moon")])
+def test_next_phase_matches_ephem(phase, next_name):
+    ephem = pytest.importorskip("ephem")
+    for t in random_instants(300, seed=10 + phase):
+        d = ephem.Date(datetime.fromtimestamp(t, tz=timezone.utc).replace(tzinfo=None))
+        expected = getattr(ephem, next_name)(d).datetime().replace(tzinfo=timezone.utc).timestamp()
+        # The table keeps whole seconds
+        assert abs(next_phase(t, phase) - expected) < 1.0, datetime.fromtimestamp(t, tz=timezone.utc)
+
+
+def test_next_phase_date_matches_ephem():
+    ephem = pytest.importorskip("ephem")
+    for t in random_instants(200, seed=11):
+        d = datetime.fromtimestamp(t, tz=timezone.utc).date()
+        expected = ephem.next_full_moon(ephem.Date(d.strftime("%Y/%m/%d"))).datetime().date()
+        assert next_phase_date(d, FULL_MOON) == expected, d
+
+
+def test_lunation_fraction_runs_from_new_moon_to_new_moon():
+    for t in random_instants(200, seed=12):
+        new_moon = next_phase(t, NEW_MOON)
+        full_moon = next_phase(new_moon, FULL_MOON)
+        assert lunation_fraction(new_moon + 1) < 0.001
+        assert lunation_fraction(new_moon - 1) > 0.999
+        assert 0.45 < lunation_fraction(full_moon) < 0.55
+
+
+def test_outside_the_table_is_none():
+    assert next_phase(to_epoch(date(1800, 1, 1)), FULL_MOON) is None
+    assert next_phase(to_epoch(date(2200, 1, 1)), FULL_MOON) is None
+    assert lunation_fraction(to_epoch(date(2200, 1, 1))) is None
@@ -0,0 +1,56 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pytz")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.prayer_times import (  # noqa: E402
+    METHODS, calculate_prayer_times, calculate_prayer_times_array, format_times_array, timezone_offsets,
+)
+
+PRAYERS = ("fajr", "sunrise", "dhuhr", "asr", "maghrib", "isha")
+
+# Mid-latitudes, the tropics, southern hemisphere, and places where some
+# angles are never reached (London in June, Tromsø's midnight sun)
+PLACES = [
+    (21.4225, 39.8262, "Asia/Riyadh"),
+    (51.5074, -0.1278, "Europe/London"),
+    (69.6492, 18.9553, "Europe/Oslo"),
+    (-33.8688, 151.2093, "Australia/Sydney"),
+    (-0.1807, -78.4678, "America/Guayaquil"),
+    (61.2181, -149.9003, "America/Anchorage"),
+    (-54.8019, -68.3030, "America/Argentina/Ushuaia"),
+]
+DATES = [date(2024, 1, 15), date(2024, 3, 31), date(2024, 6, 21), date(2024, 10, 27), date(2025, 12, 21)]
+
+
+@pytest.mark.parametrize("method", sorted(METHODS))
+def test_array_engine_matches_scalar(method):
+    cases = [(lat, lng, tz, d) for lat, lng, tz in PLACES for d in DATES]
+    lats, lngs, tzs, dates = zip(*cases)
+    offsets = timezone_offsets(dates, tzs)
+    result = calculate_prayer_times_array(lats, lngs, dates, offsets, method)
+    formatted = {prayer: format_times_array(result[prayer]) for prayer in PRAYERS}
+
+    for i, (lat, lng, tz, d) in enumerate(cases):
+        expected = calculate_prayer_times(lat, lng, d, tz, method)
+        assert result["method"] == expected["method"]
+        assert {prayer: formatted[prayer][i] for prayer in PRAYERS} == \
+            {prayer: expected[prayer] for prayer in PRAYERS}, (lat, lng, d)
+
+
+def test_unreached_angles_are_nan():
+    result = calculate_prayer_times_array([69.6492], [18.9553], ["2024-06-21"], [2.0])
+    assert np.isnan(result["sunrise"]).all() and np.isnan(result["fajr"]).all()
+    assert format_times_array(result["maghrib"]) == ["N/A"]
+    assert not np.isnan(result["dhuhr"]).any()
+
+
+def test_inputs_broadcast():
+    result = calculate_prayer_times_array([[21.4], [51.5]], [39.8, -0.1, 10.0], "2024-03-20", 0.0)
+    assert result["fajr"].shape == (2, 3)
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.singleflight import SingleFlight  # noqa: E402
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("a", fetch, "a") for _ in range(5)), flight.do("b", fetch, "b"))
+
+    results = asyncio.run(run())
+    assert sorted(calls) == ["a", "b"]
+    assert results[:5] == [{"key": "a"}] * 5
+    assert all(result is results[0] for result in results[:5])
+    assert flight.stats() == {"in_flight": 0, "calls": 6, "shared": 4}
+
+
+def test_waiters_get_the_same_exception_and_the_key_is_released():
+    flight = SingleFlight("test_errors")
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+    with pytest.raises(ValueError):
+        asyncio.run(flight.do("k", fail))
+    assert len(calls) == 2
+
+
+def test_one_caller_cancelling_does_not_cancel_the_others():
+    flight = SingleFlight("test_cancel")
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", slow))
+        second = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == 42
@@ -0,0 +1,73 @@
+import json
+import logging
+import os
+import sys
+from datetime import date
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pytz")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services import tides  # noqa: E402
+from services.tides import load_stations, predict_tides  # noqa: E402
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "data", "tide_stations.example.json")
+
+
+@pytest.fixture(autouse=True)
+def unloaded(monkeypatch):
+    monkeypatch.setattr(tides, "_index", None)
+
+
+def example():
+    with open(EXAMPLE) as f:
+        return json.load(f)
+
+
+def broken_files():
+    no_stations = example()
+    del no_stations["stations"]
+    unknown_constituent = example()
+    unknown_constituent["constituents"][0] = "XX9"
+    short_amplitudes = example()
+    short_amplitudes["stations"][0]["amplitude"].pop()
+    no_lat = example()
+    del no_lat["stations"][0]["lat"]
+    return {
+        "truncated": '{"constituents": ["M2"], "stations": [',
+        "not_an_object": "[1, 2, 3]",
+        "no_stations": json.dumps(no_stations),
+        "unknown_constituent": json.dumps(unknown_constituent),
+        "short_amplitudes": json.dumps(short_amplitudes),
+        "no_lat": json.dumps(no_lat),
+    }
+
+
+def test_example_file_loads():
+    index = load_stations(EXAMPLE)
+    assert index is not None
+    station, distance = index.nearest(50.1, -5.0)
+    assert station.id == "example-1" and distance < 12
+
+
+@pytest.mark.parametrize("name", sorted(broken_files()))
+def test_bad_file_is_treated_as_missing(name, tmp_path, caplog):
+    path = tmp_path / "stations.json"
+    path.write_text(broken_files()[name])
+    with caplog.at_level(logging.ERROR, logger=tides.__name__):
+        assert load_stations(str(path)) is None
+        # Remembered, so the file isn't re-read or re-logged per request
+        assert load_stations(str(path)) is None
+    assert len(caplog.records) == 1
+
+
+def test_missing_file_is_silent(tmp_path, caplog, monkeypatch):
+    with caplog.at_level(logging.ERROR, logger=tides.__name__):
+        assert load_stations(str(tmp_path / "absent.json")) is None
+    assert not caplog.records
+
+    monkeypatch.setattr(tides, "load_stations", lambda path=None: None)
+    assert predict_tides(50.0, -5.0, date(2024, 3, 20), "Europe/London") is None
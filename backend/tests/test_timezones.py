@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+
+import pytest
+
+pytest.importorskip("h3")
+pytest.importorskip("timezonefinder")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services import timezones  # noqa: E402
+
+
+def random_points(n, seed):
+    rng = random.Random(seed)
+    return [(rng.uniform(-85, 85), rng.uniform(-180, 180)) for _ in range(n)]
+
+
+def expected_zone(lat, lng):
+    return timezones.finder().timezone_at(lat=lat, lng=lng) or "UTC"
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(timezones, "_cell_zones", {})
+    timezones.point_cache.clear()
+    yield
+    timezones.point_cache.clear()
+
+
+@pytest.fixture(scope="module")
+def index_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("tz") / "timezone_cells.bin"
+    timezones.build_cell_index(str(path))
+    return str(path)
+
+
+def test_in_process_cells_agree_with_timezonefinder(monkeypatch, fresh_state):
+    monkeypatch.setattr(timezones, "_index", False)
+    for lat, lng in random_points(2000, seed=8):
+        assert timezones.timezone_at(lat, lng) == expected_zone(lat, lng), (lat, lng)
+    assert timezones.timezone_index_stats()["cell_hits"] > 0
+
+
+def test_mapped_index_agrees_with_timezonefinder(monkeypatch, fresh_state, index_file):
+    monkeypatch.setattr(timezones, "_index", None)
+    assert timezones.load_cell_index(index_file) is not None
+    for lat, lng in random_points(2000, seed=80):
+        assert timezones.timezone_at(lat, lng) == expected_zone(lat, lng), (lat, lng)
+    assert timezones.timezone_index_stats()["mapped"]
+
+
+def test_border_points_near_a_frontier(monkeypatch, fresh_state):
+    # Along the Franco-Spanish border and the Bering Strait date line
+    monkeypatch.setattr(timezones, "_index", False)
+    points = [(42.7 + i * 0.01, -1.5 + i * 0.03) for i in range(100)]
+    points += [(65.8 + i * 0.005, -169.3 - i * 0.01) for i in range(100)]
+    for lat, lng in points:
+        assert timezones.timezone_at(lat, lng) == expected_zone(lat, lng), (lat, lng)
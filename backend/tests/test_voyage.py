@@ -0,0 +1,25 @@
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("ephem")
+pytest.importorskip("timezonefinder")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.voyage import VoyageTrack, calculate_voyage  # noqa: E402
+
+
+def test_one_day_at_sea_names_each_sun_event_once():
+    # Local midnight to local midnight at 20N 40W: about 56 nm east at 2.35 kn
+    track = VoyageTrack([(20.0, -40.0, 2.35), (20.0, -39.0, 2.35)],
+                        datetime(2024, 3, 20, 2, 40, tzinfo=timezone.utc))
+    assert 23 < track.days * 24 < 25
+
+    events = Counter(e["event"] for e in calculate_voyage(track, kinds=("sun", "twilight")))
+    expected = ["sunrise", "sunset"] + [f"{band}_{edge}" for band in ("civil", "nautical", "astronomical")
+                                        for edge in ("dawn", "dusk")]
+    assert events == Counter(expected)
@@ -1,12 +1,15 @@
 from http.server import BaseHTTPRequestHandler
+from bisect import bisect_right
 import json
 import math
+import os
+import struct
 from datetime import date, datetime, timedelta
 from urllib.parse import parse_qs, urlparse
 import urllib.request
 
 # Regional timezone definitions (lat_min, lat_max, lng_min, lng_max, tz_name, offset)
-# Order matters - more specific regions first
+# Where boxes overlap, the higher REGION_PRIORITY wins, then list order
 TIMEZONE_REGIONS = [
     # === Middle East (specific first) ===
     # UAE (UTC+4)
@@ -28,7 +31,7 @@ TIMEZONE_REGIONS = [
     # Jordan (UTC+3)
     (29, 34, 34, 40, "Asia/Amman", 3),
     # Israel (UTC+2)
-    (29, 34, 34, 36, "Asia/Jerusalem", 2),
+    (29.5, 33.4, 34.2, 35.6, "Asia/Jerusalem", 2),
 
     # === South Asia ===
     # Pakistan (UTC+5)
@@ -37,10 +40,16 @@ TIMEZONE_REGIONS = [
     (6, 36, 68, 97, "Asia/Kolkata", 5.5),
     # Sri Lanka (UTC+5.5)
     (5, 10, 79, 82, "Asia/Colombo", 5.5),
-    # Nepal (UTC+5.75)
-    (26, 31, 80, 89, "Asia/Kathmandu", 5.75),
-    # Bangladesh (UTC+6)
-    (20, 27, 88, 93, "Asia/Dhaka", 6),
+    # Nepal (UTC+5.75), stepped along the southern border to stay off the Indian plains
+    (28.4, 30.5, 80, 82.5, "Asia/Kathmandu", 5.75),
+    (27.4, 29.8, 82.5, 85, "Asia/Kathmandu", 5.75),
+    (26.6, 28.3, 85, 88.2, "Asia/Kathmandu", 5.75),
+    # Bangladesh (UTC+6), clear of West Bengal, Meghalaya and Tripura
+    (21.6, 24.6, 89, 90.6, "Asia/Dhaka", 6),
+    (24.2, 26, 88.6, 89.9, "Asia/Dhaka", 6),
+    (24.2, 25.1, 89.9, 92.4, "Asia/Dhaka", 6),
+    (23, 24.2, 90.6, 91.2, "Asia/Dhaka", 6),
+    (20.7, 23, 90.6, 92.3, "Asia/Dhaka", 6),
     # Myanmar (UTC+6.5)
     (9, 29, 92, 102, "Asia/Yangon", 6.5),
 
@@ -65,10 +74,13 @@ TIMEZONE_REGIONS = [
     # === East Asia ===
     # China, Hong Kong, Taiwan (UTC+8)
     (18, 54, 73, 135, "Asia/Shanghai", 8),
-    # Japan (UTC+9)
-    (24, 46, 127, 146, "Asia/Tokyo", 9),
+    # Japan (UTC+9): Ryukyu, Kyushu/western Honshu, Honshu, Hokkaido; off the mainland
+    (24, 30.9, 122.9, 131.5, "Asia/Tokyo", 9),
+    (30.9, 36.4, 129.3, 134.5, "Asia/Tokyo", 9),
+    (33.4, 41.6, 134.5, 142.2, "Asia/Tokyo", 9),
+    (41.3, 45.6, 139.3, 146, "Asia/Tokyo", 9),
     # Korea (UTC+9)
-    (33, 43, 124, 132, "Asia/Seoul", 9),
+    (33, 38.7, 124, 130, "Asia/Seoul", 9),
 
     # === Oceania ===
     # Eastern Australia (UTC+10/11)
@@ -131,6 +143,36 @@ TIMEZONE_REGIONS = [
     (42, 63, -95, -52, "America/Toronto", -5),
 ]
 
+# Regions whose box is nested in (or overlaps) a larger, earlier box and must win there
+REGION_PRIORITY = {
+    "Asia/Bahrain": 2,
+    "Asia/Qatar": 1,
+    "Asia/Jerusalem": 2,
+    "Asia/Amman": 1,
+    "Asia/Kathmandu": 1,
+    "Asia/Colombo": 1,
+    "Asia/Dhaka": 1,
+    "Asia/Seoul": 2,
+    "Asia/Tokyo": 1,
+}
+
+# Grid cell size in degrees for the region index
+GRID_DEG = 1.0
+
+
+def build_region_index(regions, cell=GRID_DEG):
+    """Bucket region boxes by grid cell, each bucket sorted by priority then list order."""
+    index = {}
+    for order, (lat_min, lat_max, lng_min, lng_max, tz_name, _) in enumerate(regions):
+        for i in range(math.floor(lat_min / cell), math.floor(lat_max / cell) + 1):
+            for j in range(math.floor(lng_min / cell), math.floor(lng_max / cell) + 1):
+                index.setdefault((i, j), []).append((-REGION_PRIORITY.get(tz_name, 0), order))
+    return {key: tuple(regions[order] for _, order in sorted(bucket)) for key, bucket in index.items()}
+
+
+REGION_INDEX = build_region_index(TIMEZONE_REGIONS)
+
+
 # Fallback longitude-based offsets for ocean/unknown areas
 def get_lng_offset(lng):
     """Calculate timezone offset based on longitude (15° per hour)."""
@@ -149,8 +191,9 @@ PRAYER_METHODS = {
 
 def get_tz(lat, lng):
     """Get timezone name and offset for coordinates."""
-    # First check specific regional definitions
-    for lat_min, lat_max, lng_min, lng_max, tz_name, offset in TIMEZONE_REGIONS:
+    # First check the regions bucketed in this grid cell
+    cell = (math.floor(lat / GRID_DEG), math.floor(lng / GRID_DEG))
+    for lat_min, lat_max, lng_min, lng_max, tz_name, offset in REGION_INDEX.get(cell, ()):
         if lat_min <= lat <= lat_max and lng_min <= lng <= lng_max:
             return tz_name, offset
 
@@ -248,8 +291,54 @@ def calc_prayer(lat, lng, d, tz_off, decl, noon, method):
     }
 
 
+# Exact principal-phase instants 1900-2100, generated by backend/scripts/generate_lunations.py:
+# 16-byte header (magic, version, first phase, count) then int64 LE Unix seconds
+LUNATIONS_PATH = os.path.join(os.path.dirname(__file__), "lunations.bin")
+_lunations = None
+
+
+def load_lunations():
+    global _lunations
+    if _lunations is None:
+        try:
+            with open(LUNATIONS_PATH, "rb") as f:
+                data = f.read()
+            magic, version, first, n = struct.unpack_from("<4sHHI", data)
+            _lunations = (first, struct.unpack_from(f"<{n}q", data, 16)) if magic == b"LUNA" and version == 1 else False
+        except (OSError, struct.error):
+            _lunations = False
+    return _lunations or None
+
+
+def next_phase_date(d, phase):
+    """UTC date of the first phase (0 new, 1 first quarter, 2 full, 3 last quarter) after midnight UTC on d."""
+    table = load_lunations()
+    if not table:
+        return None
+    first, instants = table
+    t = (d - date(1970, 1, 1)).days * 86400
+    i = bisect_right(instants, t)
+    if i == 0:
+        return None
+    i += (phase - (first + i)) % 4
+    return date(1970, 1, 1) + timedelta(seconds=instants[i]) if i < len(instants) else None
+
+
+def moon_age(d):
+    """Moon age in mean days at noon UTC on d, from the table when it covers d."""
+    table = load_lunations()
+    if table:
+        first, instants = table
+        t = (d - date(1970, 1, 1)).days * 86400 + 43200
+        i = bisect_right(instants, t) - 1
+        i -= (first + i) % 4
+        if 0 <= i and i + 4 < len(instants):
+            return (t - instants[i]) / (instants[i + 4] - instants[i]) * 29.530588853
+    return (d - date(2000, 1, 6)).days % 29.530588853
+
+
 def calc_lunar(d):
-    age = (d - date(2000, 1, 6)).days % 29.530588853
+    age = moon_age(d)
     phases = [(1.85, "New Moon"), (7.38, "Waxing Crescent"), (9.23, "First Quarter"), (14.77, "Waxing Gibbous"),
               (16.61, "Full Moon"), (22.15, "Waning Gibbous"), (23.99, "Last Quarter"), (29.53, "Waning Crescent")]
     phase = "New Moon"
@@ -258,8 +347,8 @@ def calc_lunar(d):
             phase = name
             break
     illum = min(1.0, max(0.0, (1 - abs(age - 14.765) / 14.765)))
-    nf = d + timedelta(days=(14.765 - age) % 29.53)
-    nn = d + timedelta(days=(29.53 - age) % 29.53)
+    nf = next_phase_date(d, 2) or d + timedelta(days=(14.765 - age) % 29.53)
+    nn = next_phase_date(d, 0) or d + timedelta(days=(29.53 - age) % 29.53)
     return {"phase": phase, "illumination": round(illum, 2), "moonrise": "05:30", "moonset": "17:45",
             "next_full_moon": nf.isoformat(), "next_new_moon": nn.isoformat()}
 
@@ -38,7 +38,19 @@ function getBeaufortScale(knots) {
 }
 
 export function WeatherCard({ data }) {
-  if (!data) return null;
+  if (!data) {
+    return (
+      <div className="bg-white dark:bg-nav-dark-card rounded-lg p-4 shadow-md">
+        <div className="flex items-center gap-2 mb-4">
+          <Cloud className="w-6 h-6 text-accent-weather dark:text-accent-weather-dark" />
+          <h3 className="font-bold text-lg text-nav-text dark:text-nav-dark-text">Marine Weather</h3>
+        </div>
+        <p className="text-sm text-gray-500 dark:text-gray-400">
+          No forecast available for this date and location.
+        </p>
+      </div>
+    );
+  }
 
   const beaufort = getBeaufortScale(data.wind.speed_knots);
 
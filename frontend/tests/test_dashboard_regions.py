@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api", "v1"))
+
+from dashboard import get_tz  # noqa: E402
+
+
+@pytest.mark.parametrize("lat, lng, expected", [
+    # Mainland neighbours stay outside the Bangladesh, Nepal and Japan boxes
+    (22.57, 88.36, "Asia/Kolkata"),    # Kolkata
+    (26.85, 80.95, "Asia/Kolkata"),    # Lucknow
+    (26.76, 83.37, "Asia/Kolkata"),    # Gorakhpur
+    (25.57, 91.88, "Asia/Kolkata"),    # Shillong
+    (23.83, 91.28, "Asia/Kolkata"),    # Agartala
+    (45.75, 126.63, "Asia/Shanghai"),  # Harbin
+    (44.55, 129.63, "Asia/Shanghai"),  # Mudanjiang
+    (23.81, 90.41, "Asia/Dhaka"),
+    (22.36, 91.78, "Asia/Dhaka"),      # Chittagong
+    (24.90, 91.87, "Asia/Dhaka"),      # Sylhet
+    (27.70, 85.32, "Asia/Kathmandu"),
+    (28.21, 83.99, "Asia/Kathmandu"),  # Pokhara
+    (35.68, 139.69, "Asia/Tokyo"),
+    (43.06, 141.35, "Asia/Tokyo"),     # Sapporo
+    (33.59, 130.40, "Asia/Tokyo"),     # Fukuoka
+    (26.21, 127.68, "Asia/Tokyo"),     # Naha
+    (37.57, 126.98, "Asia/Seoul"),
+    (31.77, 35.21, "Asia/Jerusalem"),
+    (31.95, 35.93, "Asia/Amman"),
+])
+def test_region_spot_checks(lat, lng, expected):
+    assert get_tz(lat, lng)[0] == expected